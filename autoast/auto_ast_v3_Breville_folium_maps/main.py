@@ -17,55 +17,36 @@
 
 
 import os
-from dotenv import load_dotenv
-from logging_setup import setup_logging
-from database_connection import setup_bcgw
-from toolbox_import import import_ast
-from ast_factory import AST_FACTORY
+import sys
+import logging
 
+# The autoast package sits in the folder above this one
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 
+# Breville: warm workers, result and AOI caches, duration based timeouts and the progress server (see autoast/profiles.py)
+PROFILE = 'v3'
 
 ## *** INPUT YOUR EXCEL FILE NAME HERE ***
 excel_file = 'Cariboo_replacement_1_job.xlsx'
 
+## Maximum number of AST jobs to run at the same time (None uses the profile's setting)
+max_workers = None
+
+## Log level, logging.DEBUG also logs a banner and the details of every queuefile row (slow on big queues)
+log_level = logging.INFO
+
+## Warm workers are replaced with a fresh process after this many jobs or this much memory growth in MB (None uses the defaults)
+max_jobs_per_worker = None
+max_rss_growth_mb = None
+
 
 
 #################################################################################################################################################################################
 if __name__ == '__main__':
-    current_path = os.path.dirname(os.path.realpath(__file__))
+    # Imported here and not at the top: multiprocessing re-runs the top of this script in every worker it spawns
+    from autoast.runner import run_profile
 
-    # Call the setup_logging function to log the messages
-    logger = setup_logging()
-
-    # Load the default environment
-    load_dotenv()
-
-    # Call the import_ast function to import the AST toolbox
-    template = import_ast(logger)
-
-    # Call the setup_bcgw function to set up the database connection
-    secrets = setup_bcgw(logger)
-
-    # Create the path for the queuefile
-    qf = os.path.join(current_path, excel_file)
-
-    # Create an instance of the Ast Factory class, assign the queuefile path and the bcgw username and passwords to the instance
-    ast = AST_FACTORY(qf, secrets[0], secrets[1], logger, current_path)
-
-    if not os.path.exists(qf):
-        print("Main: Queuefile not found, creating new queuefile")
-        logger.info("Main: Queuefile not found, creating new queuefile")
-        ast.create_new_queuefile()
-        
-    # Load the jobs using the load_jobs method. This will scan the excel sheet and assign to "jobs"    
-    jobs = ast.load_jobs()
-    
-    ast.batch_ast()
-    
-    ast.re_load_failed_jobs_V2()
-    
-    ast.batch_ast()
-    
-    print("Main: AST Factory COMPLETE")
-    logger.info("Main: AST Factory COMPLETE")
+    current_path = os.path.dirname(os.path.realpath(__file__))
 
+    # The queuefile, .env and caches of this folder are used
+    run_profile(PROFILE, excel_file, current_path, max_workers, log_level, max_jobs_per_worker, max_rss_growth_mb)
@@ -0,0 +1,8 @@
+###############################################################################################################################################################################
+#
+# autoast - batch processing of the automated status tool
+#
+# One engine for the V1, V2 and V3 autoast folders, see profiles.py. Nothing is imported here so the spawned workers,
+# which only need autoast.mp_worker, start quickly (check_startup_time.py).
+#
+###############################################################################################################################################################################
@@ -0,0 +1,11 @@
+###############################################################################################################################################################################
+#
+# python -m autoast, see cli.py
+#
+###############################################################################################################################################################################
+import sys
+from .cli import main
+
+# Spawned workers import this module as __mp_main__, they must not run the command again
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
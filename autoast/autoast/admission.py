@@ -0,0 +1,129 @@
+###############################################################################################################################################################################
+#
+# Admission control for batch_ast
+#
+# Every status tool run holds a BCGW Oracle session, writes a file GDB to its output directory and can take several GB of RAM.
+# The supervisor asks the AdmissionController before it starts a job, and jobs wait in the queue until the machine has room.
+#
+###############################################################################################################################################################################
+import os
+import time
+import shutil
+import logging
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def available_memory_mb():
+    ''' Returns the memory available to new processes in MB, or None if it can't be measured on this machine '''
+    if psutil is not None:
+        return psutil.virtual_memory().available / (1024 * 1024)
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def free_disk_mb(path):
+    ''' Returns the free space in MB on the drive holding path, or None if it can't be measured. The folder doesn't have to exist yet '''
+    path = os.path.abspath(path)
+    # Output directories are created by the job, so measure the nearest folder that already exists
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    try:
+        return shutil.disk_usage(path).free / (1024 * 1024)
+    except OSError:
+        return None
+
+
+class AdmissionController:
+    '''
+    Decides if a job can start now. A job is held back while fewer than min_free_memory_mb MB of memory are available,
+    while max_bcgw_sessions jobs are already running (each run holds its own BCGW session), or while its output directory
+    has less than min_free_disk_mb MB free. Any limit set to None isn't checked. When nothing is running the job is let
+    through anyway, since waiting would never free anything up, and it fails or succeeds on its own.
+
+    A job that has just started hasn't taken its memory yet, so job_memory_mb is reserved for every job admitted in the last
+    job_memory_ramp seconds and taken off the available memory. Without it every free slot would be filled in one pass as
+    long as memory is just above the minimum.
+    '''
+
+    def __init__(self, min_free_memory_mb=None, max_bcgw_sessions=None, min_free_disk_mb=None, logger=None,
+                 job_memory_mb=None, job_memory_ramp=120) -> None:
+        self.min_free_memory_mb = min_free_memory_mb
+        self.max_bcgw_sessions = max_bcgw_sessions
+        self.min_free_disk_mb = min_free_disk_mb
+        self.job_memory_mb = job_memory_mb
+        self.job_memory_ramp = job_memory_ramp
+        self.logger = logger or logging.getLogger(__name__)
+        # What jobs are being held back for ('sessions', 'memory' or an output directory), so each wait is only logged when it starts
+        self.waiting_on = set()
+        # time.time() each job was admitted at, for the jobs whose memory is still reserved
+        self.admitted = []
+
+    def check_machine(self, running):
+        ''' Returns (what is short, why) if no job can start on this machine right now, None if one can '''
+        if self.max_bcgw_sessions and running >= self.max_bcgw_sessions:
+            return 'sessions', f"{running} of {self.max_bcgw_sessions} BCGW sessions in use"
+        if self.min_free_memory_mb:
+            available = available_memory_mb()
+            if available is not None:
+                reserved = self.reserved_memory_mb()
+                if available - reserved < self.min_free_memory_mb:
+                    return 'memory', (f"{available:.0f} MB of memory available ({reserved:.0f} MB of it reserved for jobs that just started), "
+                                      f"{self.min_free_memory_mb} MB needed")
+        return None
+
+    def reserved_memory_mb(self, now=None):
+        ''' Memory held back for the jobs admitted in the last job_memory_ramp seconds '''
+        if not self.job_memory_mb:
+            return 0
+        now = time.time() if now is None else now
+        self.admitted = [admitted for admitted in self.admitted if now - admitted < self.job_memory_ramp]
+        return self.job_memory_mb * len(self.admitted)
+
+    def job_admitted(self, now=None):
+        ''' Reserves memory for a job that is being handed to a worker '''
+        if self.job_memory_mb:
+            self.admitted.append(time.time() if now is None else now)
+
+    def check_job(self, payload):
+        ''' Returns (what is short, why) if this job can't start right now, None if it can '''
+        if self.min_free_disk_mb and payload.output_directory:
+            free = free_disk_mb(payload.output_directory)
+            if free is not None and free < self.min_free_disk_mb:
+                return payload.output_directory, f"{free:.0f} MB free for {payload.output_directory}, {self.min_free_disk_mb} MB needed"
+        return None
+
+    def admit_machine(self, running):
+        ''' True if the machine has room for another job with running jobs already going '''
+        return self._decide(self.check_machine(running), ('sessions', 'memory'), running, 'the next job')
+
+    def admit_job(self, payload, running):
+        ''' True if this job can start now with running jobs already going '''
+        return self._decide(self.check_job(payload), (payload.output_directory,), running, f"job {payload.job_index}")
+
+    def _decide(self, shortage, checked, running, what):
+        if shortage is None:
+            self.waiting_on.difference_update(checked)
+            return True
+        key, reason = shortage
+        if running == 0:
+            self.logger.warning(f"Admission Control: Starting {what} with nothing else running although {reason}")
+            self.waiting_on.discard(key)
+            return True
+        if key not in self.waiting_on:
+            self.waiting_on.add(key)
+            self.logger.info(f"Admission Control: Holding {what} in the queue, {reason}")
+            print(f"Admission Control: Holding {what} in the queue, {reason}")
+        return False
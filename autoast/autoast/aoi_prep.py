@@ -0,0 +1,225 @@
+###############################################################################################################################################################################
+#
+# AOI preparation stage
+#
+###############################################################################################################################################################################
+import os
+import json
+import hashlib
+import logging
+from typing import NamedTuple
+from concurrent.futures import ProcessPoolExecutor
+from .scratch import ScratchWorkspace
+from .logging_setup import log_channel, log_level, setup_worker_logging, set_log_phase
+
+
+class AoiTask(NamedTuple):
+    ''' One AOI to build before the AST jobs run. kind is 'kml' (build a GDB from the KML) or 'shp' (run FW Setup on the shapefile) '''
+    kind: str
+    source: str             # feature_layer path from the queuefile
+    file_number: str        # FW file number, only used for shapefiles
+
+
+def aoi_task_key(task):
+    ''' Identifies an AOI task regardless of which job asked for it '''
+    source = os.path.normcase(os.path.abspath(task.source))
+    return hashlib.sha256(f"{task.kind}|{source}|{str(task.file_number).upper()}".encode('utf-8')).hexdigest()
+
+
+def source_stamp(path):
+    ''' Modified time and size of the AOI source file, a changed file is prepared again '''
+    stat = os.stat(path)
+    return [int(stat.st_mtime), stat.st_size]
+
+
+def scratch_key(task):
+    ''' Scratch workspace key of a task, a changed source file gets a new workspace so an AOI in use is never replaced '''
+    return hashlib.sha256(f"{aoi_task_key(task)}|{source_stamp(task.source)}".encode('utf-8')).hexdigest()[:16]
+
+
+def init_prep_worker(channel, level):
+    ''' Sends the records of a preparation worker to the main script's log listener '''
+    if channel is not None:
+        setup_worker_logging(channel, level)
+    set_log_phase('prep')
+
+
+def prepare_aoi(task, template=None, workspace=None):
+    '''
+    Builds one AOI in a preparation worker process and returns the path of the feature layer the AST job should use.
+    KMLs are written to a GDB in the task's own scratch workspace, so KMLs with the same name in different folders don't collide.
+    '''
+    # Imported here so the parent process only pays for geopandas and arcpy in the preparation workers
+    from .aoi_utilities import build_aoi_from_kml, build_aoi_from_shp
+
+    logger = logging.getLogger(f"Aoi Prep: worker_{os.getpid()}")
+    if task.kind == 'kml':
+        return build_aoi_from_kml(task.source, logger, workspace)
+    return build_aoi_from_shp({'file_number': task.file_number}, task.source, template, logger)
+
+
+def prepare_shp_aois(tasks, template=None, max_threads=4):
+    '''
+    Runs FW Setup for all the shapefile tasks in one batch in a preparation worker process. Returns a list in task order
+    holding the FW Setup shapefile path, or a RuntimeError describing why that shapefile failed.
+    '''
+    from .aoi_utilities import build_aois_from_shp
+
+    logger = logging.getLogger(f"Aoi Prep: worker_{os.getpid()}")
+    results = build_aois_from_shp([(task.file_number, task.source) for task in tasks], template, logger, max_threads)
+    # arcpy exceptions don't always survive the trip back to the parent process
+    return [result if isinstance(result, str) else RuntimeError(f"{type(result).__name__}: {result}") for result in results]
+
+
+class AoiPrepCache:
+    '''
+    Remembers the AOI built from each source file, keyed by task and checked against the source file's modified
+    time and size, so the same KML or shapefile is never converted twice in a run or across reruns. The memo is
+    kept in a JSON file beside the queuefile script.
+    '''
+
+    def __init__(self, path, logger=None) -> None:
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, task):
+        ''' Returns the prepared feature layer for a task, None if it was never built or the source has changed since '''
+        entry = self.entries.get(aoi_task_key(task))
+        if entry is None:
+            return None
+        try:
+            if entry['stamp'] != source_stamp(task.source):
+                return None
+        except OSError:
+            return None
+        output = entry['output']
+        # KML outputs are a feature class inside a GDB folder, check the GDB
+        if not (os.path.exists(output) or os.path.exists(os.path.dirname(output))):
+            return None
+        return output
+
+    def put(self, task, output):
+        try:
+            self.entries[aoi_task_key(task)] = {'source': task.source, 'stamp': source_stamp(task.source), 'output': output}
+        except OSError:
+            pass
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self.logger.warning(f"Aoi Prep: Could not save the AOI cache {self.path} - {e}")
+
+
+class AoiPreparer:
+    '''
+    AoiPreparer runs AOI preparation on its own process pool while load_jobs keeps reading the queuefile.
+    submit() is called as each row is read. Identical tasks share one build and cached AOIs are reused without building.
+    results() waits for the pool and returns job index -> prepared feature layer, plus job index -> error for the AOIs that failed.
+    KML AOIs are built in a ScratchWorkspace each, job_workspaces maps job index -> workspace once results() has run.
+    Shapefiles are gathered and sent through FW Setup as one batch (see aoi_utilities.build_aois_from_shp) when results() is called.
+    '''
+
+    def __init__(self, max_workers, cache, template=None, logger=None, fw_setup_threads=4) -> None:
+        self.max_workers = max_workers
+        self.fw_setup_threads = fw_setup_threads
+        self.cache = cache
+        self.template = template
+        self.logger = logger or logging.getLogger(__name__)
+        self.executor = None
+        # task key -> (task, future or prepared feature layer, [job indexes waiting on it])
+        self.tasks = {}
+        # task key -> ScratchWorkspace of the KML tasks
+        self.workspaces = {}
+        self.job_workspaces = {}
+        # Task keys of the shapefile tasks waiting for the batch FW Setup
+        self.shp_batch = []
+
+    def submit(self, job_index, task):
+        key = aoi_task_key(task)
+        if key in self.tasks:
+            self.tasks[key][2].append(job_index)
+            self.logger.info(f"Aoi Prep: Job {job_index} uses the same AOI as job {self.tasks[key][2][0]}, it will only be built once")
+            return
+
+        workspace = None
+        if task.kind == 'kml':
+            try:
+                self.workspaces[key] = ScratchWorkspace(scratch_key(task))
+                workspace = self.workspaces[key].claim()
+            except OSError as e:
+                self.logger.warning(f"Aoi Prep: Could not create a scratch workspace for job {job_index}, building in TEMP - {e}")
+
+        cached = self.cache.get(task)
+        if cached is not None:
+            self.logger.info(f"Aoi Prep: Job {job_index} reusing the AOI already built from {task.source}: {cached}")
+            self.tasks[key] = (task, cached, [job_index])
+            return
+
+        if task.kind == 'shp':
+            self.logger.info(f"Aoi Prep: Job {job_index} added to the batch FW Setup for {task.source}")
+            self.shp_batch.append(key)
+            self.tasks[key] = (task, None, [job_index])
+            return
+
+        self.logger.info(f"Aoi Prep: Job {job_index} building a {task.kind} AOI from {task.source}")
+        self.tasks[key] = (task, self._executor().submit(prepare_aoi, task, self.template, workspace), [job_index])
+
+    def _executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_prep_worker, initargs=(log_channel(), log_level()))
+            self.logger.info(f"Aoi Prep: Started the AOI preparation pool with {self.max_workers} workers")
+        return self.executor
+
+    def results(self):
+        prepared = {}
+        errors = {}
+        self.job_workspaces = {}
+        try:
+            # Run the gathered shapefiles through FW Setup together
+            shp_results = {}
+            if self.shp_batch:
+                self.logger.info(f"Aoi Prep: Running batch FW Setup on {len(self.shp_batch)} shapefiles")
+                batch = self._executor().submit(prepare_shp_aois, [self.tasks[key][0] for key in self.shp_batch], self.template, self.fw_setup_threads)
+                try:
+                    shp_results = dict(zip(self.shp_batch, batch.result()))
+                except Exception as e:
+                    shp_results = {key: e for key in self.shp_batch}
+
+            for key, (task, result, job_indexes) in self.tasks.items():
+                if isinstance(result, str):
+                    output = result
+                else:
+                    try:
+                        output = shp_results[key] if result is None else result.result()
+                        if isinstance(output, Exception):
+                            raise output
+                    except Exception as e:
+                        self.logger.error(f"Aoi Prep: Could not build the AOI from {task.source} for jobs {job_indexes} - {e}")
+                        print(f"Aoi Prep: Could not build the AOI from {task.source} - {e}")
+                        for job_index in job_indexes:
+                            errors[job_index] = e
+                        continue
+                    self.cache.put(task, output)
+                for job_index in job_indexes:
+                    prepared[job_index] = output
+                    workspace = self.workspaces.get(key)
+                    if workspace is not None:
+                        self.job_workspaces[job_index] = workspace
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+            self.cache.save()
+        self.tasks = {}
+        self.workspaces = {}
+        self.shp_batch = []
+        return prepared, errors
@@ -1,9 +1,10 @@
 
-import arcpy
 import os
 import datetime
-import geopandas
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from .gp_backend import get_backend
+from .kml_aoi import read_kml_polygons, write_kml_aoi
 
 # Assign the shapefile template for FW Setup to a variable
 template = os.getenv('TEMPLATE') # File path in .env
@@ -40,8 +41,8 @@ template = os.getenv('TEMPLATE') # File path in .env
 #         print('No feature layer provided in job')
 #         logger.warning('Classifying Input Type - No feature layer provided in job')
 
-def build_aoi_from_kml(aoi, logger):
-        "Write shp file for temporary use"
+def build_aoi_from_kml(aoi, logger, workspace=None):
+        "Write shp file for temporary use. The GDB goes in the scratch workspace folder if one is given, otherwise in TEMP"
 
         # Ensure the KML file exists
         if not os.path.exists(aoi):
@@ -49,9 +50,7 @@ def build_aoi_from_kml(aoi, logger):
 
         print("Building AOI from KML")
         logger.info("Building AOI from KML")
-        from fiona.drvsupport import supported_drivers
-        supported_drivers['LIBKML'] = 'rw'
-        tmp = os.getenv('TEMP')
+        tmp = workspace or os.getenv('TEMP')
         if not tmp:
             raise EnvironmentError("TEMP environment variable is not set.")
         bname = os.path.basename(aoi).split('.')[0]
@@ -59,13 +58,29 @@ def build_aoi_from_kml(aoi, logger):
         out_name = os.path.join(tmp, bname + '.gdb')
         if os.path.exists(out_name):
             shutil.rmtree(out_name, ignore_errors=True)
-        df = geopandas.read_file(aoi)
-        df.to_file(out_name, layer=fc, driver='OpenFileGDB')
+
+        # Read the polygons with the lightweight KML reader, geopandas is only imported if that can't handle the file
+        try:
+            placemarks = read_kml_polygons(aoi)
+        except Exception as e:
+            logger.warning(f"Could not read '{aoi}' with the KML reader, falling back to geopandas - {e}")
+            placemarks = []
+
+        if placemarks:
+            out_fc = write_kml_aoi(placemarks, out_name, fc, logger)
+        else:
+            logger.info(f"No polygons read from '{aoi}' by the KML reader, using geopandas")
+            import geopandas
+            from fiona.drvsupport import supported_drivers
+            supported_drivers['LIBKML'] = 'rw'
+            df = geopandas.read_file(aoi)
+            df.to_file(out_name, layer=fc, driver='OpenFileGDB')
+            out_fc = out_name + '/' + fc
 
         #DELETE?
-        print(f' kml ouput is {out_name} / {fc}')
-        logger.info(f' kml ouput is {out_name} / {fc}')
-        return out_name + '/' + fc
+        print(f' kml ouput is {out_fc}')
+        logger.info(f' kml ouput is {out_fc}')
+        return out_fc
 
 
 
@@ -82,9 +97,9 @@ def build_aoi_from_shp(job, feature_layer_path, template, logger):
         print("Processing shapefile using FW Setup Script")
         logger.info("Processing shapefile using FW Setup Script")
         
+        backend = get_backend()
         fsj_workspace = os.getenv('FSJ_WORKSPACE')
-        arcpy.env.workspace = fsj_workspace
-        arcpy.env.overwriteOutput = False
+        backend.set_workspace(fsj_workspace, overwrite_output=False)
 
         # Check if there is a file path in Feature Layer
         if feature_layer_path:
@@ -108,14 +123,10 @@ def build_aoi_from_shp(job, feature_layer_path, template, logger):
         year = str(date.year)
 
         # Set variables
-        base = arcpy.env.workspace
+        base = backend.get_workspace()
         baseYear = os.path.join(base, year)
         outName = file_number_str
-        geometry = "POLYGON"
-    
-        m = "SAME_AS_TEMPLATE"
-        z = "SAME_AS_TEMPLATE"
-        spatialReference = arcpy.Describe(template).spatialReference
+        spatialReference = backend.spatial_reference(template)
 
         # ===========================================================================
         # Create Folders
@@ -135,6 +146,15 @@ def build_aoi_from_shp(job, feature_layer_path, template, logger):
         else:
             os.mkdir(fileFolder)
 
+        return fw_setup_shapefile(feature_layer_path, outPath, outName, template, spatialReference, logger)
+
+
+def fw_setup_shapefile(feature_layer_path, outPath, outName, template, spatialReference, logger):
+        """Creates the FW Setup shapefile outName in the outPath folder from the template, appends the AOI and writes the KML beside it.
+        Returns the shapefile path, an existing shapefile is returned without creating anything"""
+        backend = get_backend()
+        geometry = "POLYGON"
+
         # ===========================================================================
         # Create Shapefile(s) and add them to the current map
         # ===========================================================================
@@ -149,17 +169,17 @@ def build_aoi_from_shp(job, feature_layer_path, template, logger):
             return os.path.join(outPath, outName + ".shp")
         else:
             # Creating template shapefile
-            create_shp = arcpy.management.CreateFeatureclass(outPath, outName, geometry, template, m, z, spatialReference)
+            create_shp = backend.create_feature_class(outPath, outName, geometry, template, spatialReference)
             # Append the newly created shapefile with area of interest
-            append_shp = arcpy.management.Append(feature_layer_path, create_shp, "NO_TEST")
+            append_shp = backend.append(feature_layer_path, create_shp)
             print("Append Successful")
             logger.info("Append Successful")
             # Making filename for kml
             create_kml = os.path.join(outPath, outName + ".kml")
             # Make layer for kml to be converted from 
-            layer_shp = arcpy.management.MakeFeatureLayer(append_shp, outName)
+            layer_shp = backend.make_feature_layer(append_shp, outName)
             # Populate the shapefile                          
-            arcpy.conversion.LayerToKML(layer_shp, create_kml)
+            backend.layer_to_kml(layer_shp, create_kml)
             # Send message to user that kml has been created
             print("kml created: " + create_kml)
             logger.info("kml created: " + create_kml)
@@ -167,4 +187,74 @@ def build_aoi_from_shp(job, feature_layer_path, template, logger):
             print(f"FW Setup complete, returned shapefile is {os.path.join(outPath, outName + '.shp')}")
             logger.info(f"FW Setup complete, returned shapefile is {os.path.join(outPath, outName + '.shp')}")
 
-            return os.path.join(outPath, outName + ".shp")
\ No newline at end of file
+            return os.path.join(outPath, outName + ".shp")
+
+
+def build_aois_from_shp(pairs, template, logger, max_workers=4):
+        """Batch FW Setup for a list of (file_number, shapefile path) pairs. Does the same as build_aoi_from_shp for every pair
+        and writes the same folders and files, but describes the template once, creates all the folders up front and runs
+        the shapefile and KML creation on a bounded thread pool.
+        Returns a list in the same order as pairs holding the FW Setup shapefile path, or the exception if that pair failed"""
+
+        if template is None:
+            print("Unable to find the template. Check the path in .env file")
+            logger.error("Unable to find the template. Check the path in .env file")
+
+        print(f"Running batch FW Setup on {len(pairs)} shapefiles")
+        logger.info(f"Running batch FW Setup on {len(pairs)} shapefiles")
+
+        backend = get_backend()
+        fsj_workspace = os.getenv('FSJ_WORKSPACE')
+        backend.set_workspace(fsj_workspace, overwrite_output=False)
+
+        # The template and the year folder are the same for every file number
+        spatialReference = backend.spatial_reference(template)
+        baseYear = os.path.join(backend.get_workspace(), str(datetime.date.today().year))
+
+        results = [None] * len(pairs)
+        # File number -> (shapefile path, [positions in pairs]). A file number only gets one FW Setup,
+        # the same as calling build_aoi_from_shp twice, where the second call finds the shapefile already there
+        file_numbers = {}
+        for position, (file_number, feature_layer_path) in enumerate(pairs):
+            if not file_number:
+                results[position] = ValueError("Error: File Number is required if you are putting in a shapefile that has not been processed in the FW Setup Tool.")
+                continue
+            file_number_str = str(file_number).upper()
+            file_numbers.setdefault(file_number_str, (feature_layer_path, []))[1].append(position)
+
+        # ===========================================================================
+        # Create Folders
+        # ===========================================================================
+
+        print("Creating FW Setup folders . . .")
+        logger.info("Creating FW Setup folders . . .")
+        for outName in file_numbers:
+            try:
+                os.makedirs(os.path.join(baseYear, outName), exist_ok=True)
+            except OSError as e:
+                for position in file_numbers[outName][1]:
+                    results[position] = e
+
+        # ===========================================================================
+        # Create Shapefiles and KMLs, a few file numbers at a time
+        # ===========================================================================
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for outName, (feature_layer_path, positions) in file_numbers.items():
+                if results[positions[0]] is not None:
+                    continue
+                outPath = os.path.join(baseYear, outName)
+                futures[outName] = executor.submit(fw_setup_shapefile, feature_layer_path, outPath, outName, template, spatialReference, logger)
+
+            for outName, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"FW Setup failed for File Number {outName}: {e}")
+                    logger.error(f"FW Setup failed for File Number {outName}: {e}")
+                    result = e
+                for position in file_numbers[outName][1]:
+                    results[position] = result
+
+        return results
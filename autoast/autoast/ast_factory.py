@@ -0,0 +1,789 @@
+
+import os
+import logging
+import traceback
+from .scheduler import RetryPolicy
+from .status_journal import StatusJournal
+from .queuefile import QueueFileReader
+from .mp_worker import JobPayload
+from .output_utilities import analysis_key
+from .result_cache import ResultCache
+from .job_cost import order_longest_first
+from .aoi_prep import AoiTask, AoiPrepCache, AoiPreparer
+from .scratch import reap_orphans
+from .gp_backend import get_backend
+from .job_history import JobHistory, JobProfile
+from .logging_setup import set_log_phase, set_log_job
+from .session import QueueSession
+
+
+class AST_FACTORY:
+    ''' AST_FACTORY creates and manages status tool runs '''
+    XLSX_SHEET_NAME = 'ast_config'
+    AST_PARAMETERS = {
+        0: 'region',
+        1: 'feature_layer',
+        2: 'crown_file_number',
+        3: 'disposition_number',
+        4: 'parcel_number',
+        5: 'output_directory',
+        6: 'output_directory_same_as_input',
+        7: 'dont_overwrite_outputs',
+        8: 'skip_conflicts_and_constraints',
+        9: 'suppress_map_creation',
+        10: 'add_maps_to_current',
+        11: 'run_as_fcbc',
+
+    }
+    
+    ADDITIONAL_PARAMETERS = {
+        12: 'ast_condition',
+        13: 'file_number'
+    }
+    
+    AST_CONDITION_COLUMN = 'ast_condition'
+    DONT_OVERWRITE_OUTPUTS = 'dont_overwrite_outputs'
+    JOB_INDEX_KEY = 'job_index'
+    AST_SCRIPT = ''
+    STATUSING_TOOLS = None  # Folder the toolbox's status tool script imports the statusing tools from, None uses the toolbox's own default
+    JOB_TIMEOUT = 21600  # 6 hours in seconds, counted separately for each job from the moment it starts
+    # Jobs with enough similar jobs in the duration history get TIMEOUT_FACTOR times the TIMEOUT_PERCENTILE of their durations
+    # as their timeout instead, between MIN_JOB_TIMEOUT and JOB_TIMEOUT
+    JOB_HISTORY_FILE = 'autoast_job_history.sqlite'
+    ADAPTIVE_TIMEOUTS = True
+    TIMEOUT_PERCENTILE = 99
+    TIMEOUT_FACTOR = 1.5
+    MIN_JOB_TIMEOUT = 600
+    MAX_WORKERS = None  # AST jobs (arcpy interpreters) run at the same time when max_workers isn't given, None uses the core count
+    MAX_JOBS_PER_WORKER = 20  # Jobs a warm worker runs before it is replaced with a fresh process
+    MAX_WORKER_RSS_GROWTH_MB = 2048  # Memory growth that makes a warm worker replace itself
+    # Jobs wait in the queue until these are available, None turns a check off (see admission.py)
+    MIN_FREE_MEMORY_MB = 2048  # Memory that must be available before another status tool run starts
+    JOB_MEMORY_MB = 2048  # Memory a status tool run is expected to take, held back from the available memory while a job starts up
+    JOB_MEMORY_RAMP = 120  # Seconds a job's memory stays held back, by then it shows in the available memory
+    MAX_BCGW_SESSIONS = 8  # Status tool runs (each with its own BCGW session) allowed at once, on top of max_workers
+    MIN_FREE_DISK_MB = 1024  # Free space needed on the drive of a job's output directory
+    MAX_ATTEMPTS = 2  # Times a job is run before it is left as Failed
+    RETRY_BACKOFF = 60  # Seconds before the first retry of a failed job, doubled for every retry after that
+
+    # Parameters that decide what the status tool analyses. Jobs that match on all of these only differ in where
+    # the outputs go, so the analysis is run once and the outputs are copied to the other jobs' output directories
+    ANALYSIS_PARAMETERS = [
+        'region',
+        'feature_layer',
+        'crown_file_number',
+        'disposition_number',
+        'parcel_number',
+        'skip_conflicts_and_constraints',
+        'suppress_map_creation',
+        'run_as_fcbc',
+    ]
+    DEDUP_HARD_LINK = False  # Hard link the copied outputs instead of copying them, where the file system allows it
+
+    # Outputs of finished jobs are cached by AOI geometry, the parameters below and the analysis input spreadsheets,
+    # so a re-run of the same analysis copies the cached outputs instead of running the status tool again
+    AOI_PREP_WORKERS = 4  # Processes building AOIs from KMLs and shapefiles while the queuefile is read
+    FW_SETUP_THREADS = 4  # Shapefiles written at the same time by the batch FW Setup
+    AOI_CACHE_FILE = 'autoast_aoi_cache.json'  # AOIs already built from each KML/shapefile, so they aren't built again on reruns
+    SCRATCH_MAX_AGE_DAYS = 7  # Scratch workspaces left by earlier runs (e.g. the AOIs of failed jobs) are removed after this
+    ORDER_BY_COST = True  # Start the jobs with the biggest AOIs (most vertices and area) first instead of in spreadsheet order
+    USE_RESULT_CACHE = True  # Only jobs with suppress_map_creation set are cached, the cache doesn't hold maps
+    RESULT_CACHE_DIR = None  # Defaults to autoast_result_cache beside the script
+    RESULT_CACHE_MAX_GB = 20  # Least recently used entries are removed once the cache is bigger than this
+    RESULT_CACHE_TTL_DAYS = 7  # Entries older than this are never used, so changes to the BCGW data are picked up
+    RESULT_CACHE_PARAMETERS = [
+        'region',
+        'feature_layer',
+        'crown_file_number',
+        'disposition_number',
+        'parcel_number',
+        'skip_conflicts_and_constraints',
+        'suppress_map_creation',
+        'run_as_fcbc',
+    ]
+    PROGRESS_PORT = 8765  # Batch progress is served as JSON on http://127.0.0.1:PROGRESS_PORT/ while batch_ast runs, None turns it off
+    job_index = None  # Initialize job_index as a global variable
+    
+    def __init__(self, queuefile, db_user, db_pass, logger=None, current_path=None, max_workers=None,
+                 max_jobs_per_worker=None, max_rss_growth_mb=None, retry_policy=None, job_timeout=None) -> None:
+            self.user = db_user
+            self.user_cred = db_pass
+            self.queuefile = queuefile
+            self.jobs = []
+            self.logger = logger or logging.getLogger(__name__)
+            self.current_path = current_path  
+            # Status changes are journaled beside the queuefile and written to the workbook in batches
+            self.journal = StatusJournal(queuefile, self.logger)
+            # The last queuefile reader, it holds the job_index to Excel row index
+            self.reader = None
+            # Scratch workspaces of the prepared AOIs keyed by job index, removed once their jobs are complete
+            self.aoi_workspaces = {}
+            # Estimated seconds of each queued job from its AOI size, keyed by job index. Filled in by order_by_cost
+            self.job_estimates = {}
+            # (vertex count, area in hectares) of each queued job's AOI, keyed by job index. Filled in by order_by_cost
+            self.job_sizes = {}
+            # Duration history of earlier jobs, opened by job_history()
+            self._job_history = None
+            # Maximum number of AST jobs (arcpy interpreters) allowed to run at the same time, defaults to MAX_WORKERS or the core count
+            self.max_workers = max(1, int(max_workers or self.MAX_WORKERS or os.cpu_count() or 1))
+            # Warm workers are recycled after this many jobs or this much memory growth (MB)
+            self.max_jobs_per_worker = max_jobs_per_worker or self.MAX_JOBS_PER_WORKER
+            self.max_rss_growth_mb = max_rss_growth_mb or self.MAX_WORKER_RSS_GROWTH_MB
+            # Failed jobs are retried within the same batch, see scheduler.RetryPolicy
+            self.retry_policy = retry_policy or RetryPolicy(max_attempts=self.MAX_ATTEMPTS, backoff_seconds=self.RETRY_BACKOFF)
+            # Longest a job may run (seconds), timeouts from the duration history are kept below it
+            self.job_timeout = job_timeout or self.JOB_TIMEOUT
+#LOAD JOBS
+    def load_jobs(self, only_rows=None, skip_conditions=()):
+        '''
+        load jobs will check for the existence of the queuefile, if it exists it will load the jobs from the queuefile. Checking if they 
+        are Complete and if not, it will add them to the jobs  as Queued.
+        only_rows limits the load to these Excel row numbers and rows whose condition is in skip_conditions (e.g. 'FAILED') are
+        left as they are, see row_selected.
+        '''
+        # NOTE pass job index into load jobs function
+        #global job_index
+        set_log_phase('load')
+        self.logger.info("Loading Jobs...")
+        # Per row banners, details and prints are only written at DEBUG level, on big queues they cost more than the loading
+        verbose = self.logger.isEnabledFor(logging.DEBUG)
+
+        # Initialize the jobs list to store jobs
+        self.jobs = []
+
+        # Check if the queue file exists
+        assert os.path.exists(self.queuefile), "Queue file does not exist"
+        if os.path.exists(self.queuefile):
+
+            # Replay any job results left in the journal by a crashed run before reading the workbook
+            self.flush_job_results()
+
+            # AOIs are built on their own pool while the rest of the queuefile is read
+            aoi_preparer = self.aoi_preparer()
+
+            try:
+                # Read the sheet once, row by row. Blank rows are skipped by the reader
+                reader = self.queuefile_reader()
+                for record in reader:
+                    # Rows outside only_rows or with a skipped condition are left as they are in the workbook
+                    if not self.row_selected(record, only_rows, skip_conditions):
+                        continue
+
+                    job_index = record.job_index
+                    job = record.job
+                    ast_condition = record.ast_condition
+
+                    # Dictionary where key is index key is Job number dictionary is the dictionary of jobs
+                    # Send job to processer and include status
+                    set_log_job(job_index)
+                    if verbose:
+                        self.logger.debug("-------------------------------------------------------------------------------")
+                        self.logger.debug("-                        Load Jobs: Start of Job %s                               -", job_index)
+                        self.logger.debug("-------------------------------------------------------------------------------")
+
+                    # Keep the spreadsheet job index with the job so results go back to the right row
+                    job[self.JOB_INDEX_KEY] = job_index
+
+                    # Skip if marked as "COMPLETE"
+                    if ast_condition.upper() == 'COMPLETE':
+                        if verbose:
+                            print(f"Skipping job {job_index} as it is marked COMPLETE.")
+                        self.logger.debug("Load Jobs - Skipping job %s as it is marked COMPLETE.", job_index)
+
+                    # Check if the ast_condition is None, empty, or not 'COMPLETE'
+                    else:
+                        # Assign 'Queued' to the ast_condition and update the job dictionary
+                        ast_condition = 'Queued'
+                        
+                        # Assign the updated ast_condition to the job dictionary (queued)
+                        job[self.AST_CONDITION_COLUMN] = ast_condition
+                        self.logger.debug("Load Jobs - (Queued assigned to Job (%s) is (%s)", job_index, ast_condition)
+
+                        # Update the Excel sheet with the new condition
+                        #LOAD JOBS ADD_JOB_RESULT FUNCTION IS CALLED HERE
+                        try:
+                            self.add_job_result(job_index, ast_condition)
+                            self.logger.debug("Load Jobs - Added job condition '%s' for job %s to jobs list", ast_condition, job_index)
+                        except Exception as e:
+                            print(f"Error updating Excel sheet at row {job_index}: {e}")
+                            self.logger.error("Load Jobs - Error updating Excel sheet at row %s: %s", job_index, e)
+                            continue
+
+                        # Classify the input type for the job
+                        try:
+                            self.logger.debug("Classifying input type for job %s", job_index)
+                            aoi_task = self.classify_input_type(job)
+                            if aoi_task is not None:
+                                aoi_preparer.submit(job_index, aoi_task)
+ 
+                        except Exception as e:
+                            print(f"Error classifying input type for job {job}: {e}")
+                            self.logger.error("Error classifying input type for job %s: %s", job, e)
+                            
+                    # Add the job to the jobs list after all checks and processing
+                    self.jobs.append(job)
+                    self.logger.debug("Load Jobs - Job Condition is (%s), adding job: %s to jobs list", ast_condition, job_index)
+
+                    if verbose:
+                        self.logger.debug("-------------------------------------------------------------------------------")
+                        self.logger.debug("-                        End of Job %s                                -", job_index)
+                        self.logger.debug("-------------------------------------------------------------------------------")
+                set_log_job(None)
+
+                print(f"Load Jobs - Loaded {len(self.jobs)} jobs, skipped {reader.blank_rows} blank rows")
+                self.logger.info("Load Jobs - Loaded %s jobs, skipped %s blank rows", len(self.jobs), reader.blank_rows)
+                    
+            except FileNotFoundError as e:
+                set_log_job(None)
+                print(f"Error: Queue file not found - {e}")
+                self.logger.error("Error: Queue file not found - %s", e)
+            except Exception as e:
+                set_log_job(None)
+                print(f"Unexpected error loading jobs: {e}")
+                self.logger.error("Unexpected error loading jobs: %s", e)
+
+            # Point the jobs at their AOIs once the preparation stage has finished
+            self.apply_prepared_aois(aoi_preparer)
+
+            # Write the Queued conditions to the workbook in one save
+            self.flush_job_results()
+
+            return self.jobs
+
+
+    def row_selected(self, record, only_rows=None, skip_conditions=()):
+        ''' True if a queuefile row is loaded: its Excel row number is in only_rows (None for every row) and its condition isn't in skip_conditions '''
+        if only_rows is not None and record.excel_row not in only_rows:
+            return False
+        return record.ast_condition.upper() not in [condition.upper() for condition in skip_conditions]
+
+    def queuefile_reader(self):
+        '''Returns a streaming reader over the queuefile. The reader keeps the job_index to Excel row index used by flush_job_results.'''
+        self.reader = QueueFileReader(self.queuefile, self.XLSX_SHEET_NAME, self.AST_CONDITION_COLUMN, self.logger)
+        return self.reader
+
+
+    def classify_input_type(self, job):
+        '''
+        Classify the input type of a job. Returns the AoiTask that builds its AOI (KMLs, and shapefiles with a FW file number),
+        or None if the feature layer can be used as it is.
+        '''
+
+        verbose = self.logger.isEnabledFor(logging.DEBUG)
+        if job.get('feature_layer'):
+            feature_layer_path = job['feature_layer']
+            if verbose:
+                print(f"Processing feature layer: {feature_layer_path}")
+            self.logger.debug("Classifying Input Type - Processing feature layer: %s", feature_layer_path)
+
+            if feature_layer_path.lower().endswith(('.kml', '.kmz')):
+                if verbose:
+                    print('KML found, building AOI from KML')
+                self.logger.debug('Classifying Input Type - KML found, building AOI from KML')
+                return AoiTask('kml', feature_layer_path, '')
+
+            elif feature_layer_path.lower().endswith('.shp'):
+                if job.get('file_number'):
+                    if verbose:
+                        print(f"File number found, running FW setup on shapefile: {feature_layer_path}")
+                    self.logger.debug("Classifying Input Type - File number found, running FW setup on shapefile: %s", feature_layer_path)
+                    return AoiTask('shp', feature_layer_path, str(job['file_number']))
+                else:
+                    if verbose:
+                        print('No FW File Number provided for the shapefile, using original shapefile path')
+                    self.logger.debug('Classifying Input Type - No FW File Number provided, using original shapefile path')
+            else:
+                print(f"Unsupported feature layer format: {feature_layer_path}")
+                self.logger.warning("Classifying Input Type - Unsupported feature layer format: %s - Marking job as Failed", feature_layer_path)
+                self.add_job_result(job.get(self.JOB_INDEX_KEY), 'Failed')
+        else:
+            print('No feature layer provided in job')
+            self.logger.warning('Classifying Input Type - No feature layer provided in job')
+        return None
+
+    def aoi_preparer(self):
+        ''' Returns the AoiPreparer that builds the AOIs of the queued jobs on its own process pool '''
+        # Clear out the scratch workspaces of crashed or long finished runs first
+        reap_orphans(self.SCRATCH_MAX_AGE_DAYS * 24 * 3600, logger=self.logger)
+        cache = AoiPrepCache(os.path.join(self.current_path or os.path.dirname(self.queuefile), self.AOI_CACHE_FILE), self.logger)
+        return AoiPreparer(self.AOI_PREP_WORKERS, cache, os.getenv('TEMPLATE'), self.logger, self.FW_SETUP_THREADS)
+
+    def apply_prepared_aois(self, aoi_preparer):
+        ''' Waits for the AOI preparation stage and points each job's feature_layer at its prepared AOI '''
+        prepared, errors = aoi_preparer.results()
+        self.aoi_workspaces = aoi_preparer.job_workspaces
+        for job in self.jobs:
+            job_index = job.get(self.JOB_INDEX_KEY)
+            if job_index in prepared:
+                job['feature_layer'] = prepared[job_index]
+                self.logger.debug("Load Jobs - Job %s feature layer set to prepared AOI %s", job_index, prepared[job_index])
+            elif job_index in errors:
+                print(f"Error classifying input type for job {job}: {errors[job_index]}")
+                self.logger.error(f"Error classifying input type for job {job}: {errors[job_index]}")
+        if prepared or errors:
+            print(f"Load Jobs - Prepared {len(prepared)} AOIs, {len(errors)} failed")
+
+#ADD JOB RESULT                        
+    def add_job_result(self, job_index, condition):
+        ''' 
+        Records a job result for the Excel spreadsheet. If the job is successful, the ast_condition column will be updated to "COMPLETE",
+        if the job failed, it will be updated to "Failed". The change is appended to the status journal and written to the
+        workbook the next time flush_job_results is called.
+        '''
+        try:
+            self.journal.append(job_index, condition)
+            self.logger.debug("Add Job Result - Journaled Job %s with condition '%s'.", job_index, condition)
+
+        except PermissionError as e:
+            print(f"Error: Permission denied when trying to write the status journal - {e}")
+            self.logger.error(f"Error: Permission denied when trying to write the status journal - {e}")
+
+        except Exception as e:
+            print(f"Unexpected error while adding job result: {e}")
+            self.logger.error(f"Unexpected error while adding job result: {e}")
+
+#FLUSH JOB RESULTS
+    def flush_job_results(self):
+        '''
+        Writes every journaled job result to the Excel spreadsheet in a single load and save of the workbook.
+        Also replays results left in the journal by a run that crashed before it could flush.
+        Returns the number of results written.
+        '''
+        if not self.journal.has_pending():
+            return 0
+
+        self.logger.info("\n")
+        self.logger.info("##########################################################################################################################")
+        self.logger.info("#")
+        self.logger.info("Flushing Job Results to the Queuefile")
+        self.logger.info("#")
+        self.logger.info("##########################################################################################################################")
+        self.logger.info("\n")
+
+        entries, files = self.journal.checkpoint()
+        if not entries:
+            self.journal.commit(files)
+            return 0
+
+        try:
+            # Load the workbook
+            # openpyxl is only imported once a workbook is needed, it is the slowest import of the factory
+            from openpyxl import load_workbook
+            wb = load_workbook(filename=self.queuefile)
+            self.logger.info(f"Flush Job Results - Workbook loaded")
+            
+            # Load the correct worksheet
+            ws = wb[self.XLSX_SHEET_NAME]
+
+            # Read the header index for the ast_condition column
+            header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True))
+            
+            # Check if 'AST CONDITION COLUMN' exists in the header. If it is not found, raise a ValueError
+            if self.AST_CONDITION_COLUMN not in header:
+                raise ValueError(f"'{self.AST_CONDITION_COLUMN}' column not found in the spreadsheet.")
+            
+            # Find the ast condition column and assign it to the correct index
+            ast_condition_index = header.index(self.AST_CONDITION_COLUMN) + 1  # +1 because Excel columns are 1-indexed
+
+            # # Find the dont_overwrite_outputs column and assign it to the correct index
+            dont_overwrite_outputs_index = header.index(self.DONT_OVERWRITE_OUTPUTS) + 1  # +1 because Excel columns are 1-indexed
+
+            # Apply the results in the order they were journaled so the latest condition for a job wins
+            written = 0
+            for entry in entries:
+                job_index = entry['job_index']
+                condition = entry['condition']
+                if not isinstance(job_index, int):
+                    self.logger.warning(f"Flush Job Results - Skipping journal entry without a job index: {entry}")
+                    continue
+
+                # Look up the Excel row from the reader's index. Blank rows are never in the index
+                if self.reader is not None:
+                    excel_row_index = self.reader.row_index.get(job_index)
+                    if excel_row_index is None:
+                        self.logger.debug("Flush Job Results - Job %s is not a loaded row, not updating", job_index)
+                        continue
+                else:
+                    # Nothing has been read yet (replaying a journal at start up), fall back to checking the row itself
+                    # Calculate the actual row index in Excel, +2 to account for header and 0-index
+                    excel_row_index = job_index + 2  # NOTE I changed this to +1 and it changes the ast_condition header row to Failed. So it must stay at +2
+
+                    # Check if the row is blank before updating,  If all cell values in row_values are either None or empty strings, then all() will return True, indicating that the row is blank.
+                    row_values = []
+                    for col in range(1, len(header) + 1):
+                        cell_value = ws.cell(row=excel_row_index, column=col).value
+                        row_values.append(cell_value)
+                    if all(value is None or str(value).strip() == '' for value in row_values):
+                        print(f"Row {excel_row_index} is blank, not updating.")
+                        self.logger.debug("Flush Job Results - Job %s / Row %s is blank, not updating", job_index, excel_row_index)
+                        continue  # Do not update if the row is blank
+
+                # Update the ast condition for the specific job to the new condition (failed, queued, complete)
+                ws.cell(row=excel_row_index, column=ast_condition_index, value=condition)
+
+                # if the condition in AST_CONDITION_COLUMN is 'Requeued" then go to the dont overwrite output column and change false to true
+                if condition == 'Requeued':
+                    ws.cell(row=excel_row_index, column=dont_overwrite_outputs_index, value="True")
+                    self.logger.debug("Flush Job Results - Job %s (Row %s)  updating dont_overwrite_outputs to 'True'.", job_index, excel_row_index)
+                written += 1
+
+            # Save the workbook once with all of the updated conditions
+            wb.save(self.queuefile)
+            self.journal.commit(files)
+            self.logger.info(f"Flush Job Results - Saved {written} job results to the workbook")
+            print(f"Flushed {written} job results to the queuefile.")
+            return written
+
+        except FileNotFoundError as e:
+            print(f"Error: Queue file not found - {e}")
+            self.logger.error(f"Error: Queue file not found - {e}")
+
+        except ValueError as e:
+            print(f"Error: {e}")
+            self.logger.error(f"Error: {e}")
+
+        except PermissionError as e:
+            # Most likely the queuefile is open in Excel. The journal is kept so the results are written on the next flush
+            print(f"Error: Permission denied when trying to access the Excel file - {e}")
+            self.logger.error(f"Error: Permission denied when trying to access the Excel file, results stay in the journal - {e}")
+
+        except Exception as e:
+            print(f"Unexpected error while flushing job results: {e}")
+            self.logger.error(f"Unexpected error while flushing job results: {e}")
+        return 0
+
+#BATCH AST
+    def batch_ast(self):
+        '''
+        Uses multiprocessing to run the queued jobs in parallel. At most max_workers jobs run at once,
+        the rest wait in the queue and are started as soon as a running job frees up its slot.
+        Failed jobs are retried in the same batch according to retry_policy.
+        '''
+        # A batch is a session of one queuefile, several queuefiles can share the workers the same way (see session.py)
+        return QueueSession([self], self.logger).batch_ast()[0]
+
+    def queued_payloads(self):
+        '''
+        Builds the payloads of the Queued and Requeued jobs for a batch. Returns the payloads to run, in the order to start
+        them, and a dictionary of job index -> payloads of the identical jobs that receive their outputs.
+        '''
+        # Build the queue of jobs to run. If ast condition is queued or requeued, the job goes in the queue
+        pending = []
+        for position, job in enumerate(self.jobs):
+            if job.get(self.AST_CONDITION_COLUMN) in ['Queued', 'Requeued']:
+                pending.append(self.job_payload(job.get(self.JOB_INDEX_KEY, position), job))
+        self.logger.info(f"Batch Ast: {len(pending)} jobs waiting in the queue of {self.queuefile}")
+
+        # Run each unique analysis once, identical jobs wait for its outputs
+        pending, dependents = self.deduplicate_payloads(pending)
+
+        # Longest jobs first, so the batch doesn't end with one big AOI running on its own
+        if self.ORDER_BY_COST:
+            pending = self.order_by_cost(pending)
+        return pending, dependents
+
+
+
+    def job_payload(self, job_index, job):
+        '''
+        Builds the compact JobPayload sent to a worker: the ordered AST parameters, the job index and the output directory.
+        '''
+        # Prepare parameters
+        params = []
+
+        # Convert 'true'/'false' strings to booleans
+        for param in self.AST_PARAMETERS.values():
+            value = job.get(param)
+            if isinstance(value, str) and value.lower() in ['true', 'false']:
+                value = True if value.lower() == 'true' else False
+            params.append(value)
+
+        return JobPayload(job_index, tuple(params), job.get('output_directory') or '')
+
+
+    def deduplicate_payloads(self, payloads):
+        '''
+        Groups payloads by a hash of their ANALYSIS_PARAMETERS. Returns the payloads to run (the first job of each group)
+        and a dictionary of job index -> payloads of the identical jobs that should receive its outputs.
+        Jobs without an output directory write beside their input, so they are never grouped. Neither are jobs that create
+        maps: only the status sheet and AOI GDB are copied, and the sheet's map links point into the first job's folder.
+        '''
+        names = list(self.AST_PARAMETERS.values())
+        positions = [names.index(name) for name in self.ANALYSIS_PARAMETERS]
+        suppress_maps = names.index('suppress_map_creation')
+
+        unique = []
+        dependents = {}
+        first_of_key = {}
+        for payload in payloads:
+            if not payload.output_directory or str(payload.params[suppress_maps]).lower() != 'true':
+                unique.append(payload)
+                continue
+
+            key = analysis_key([payload.params[position] for position in positions])
+            if key in first_of_key:
+                primary = first_of_key[key]
+                if os.path.normcase(os.path.abspath(payload.output_directory)) == os.path.normcase(os.path.abspath(primary.output_directory)):
+                    # Same analysis into the same folder, let it run so the row gets its own result
+                    unique.append(payload)
+                    continue
+                dependents.setdefault(primary.job_index, []).append(payload)
+                self.logger.info(f"Batch Ast: Job {payload.job_index} is identical to job {primary.job_index}, it will receive a copy of its outputs")
+            else:
+                first_of_key[key] = payload
+                unique.append(payload)
+
+        duplicates = sum(len(d) for d in dependents.values())
+        if duplicates:
+            print(f"Batch Ast: {duplicates} identical jobs will reuse the outputs of {len(dependents)} analyses")
+            self.logger.info(f"Batch Ast: {duplicates} identical jobs will reuse the outputs of {len(dependents)} analyses")
+        return unique, dependents
+
+    def cleanup_aoi_workspaces(self, results):
+        ''' Removes the scratch workspace of every prepared AOI whose jobs all completed '''
+        completed = {job_index for job_index, condition in results if condition == 'COMPLETE'}
+        jobs_by_workspace = {}
+        for job_index, workspace in self.aoi_workspaces.items():
+            jobs_by_workspace.setdefault(workspace.path, (workspace, []))[1].append(job_index)
+
+        for workspace, job_indexes in jobs_by_workspace.values():
+            if all(job_index in completed for job_index in job_indexes):
+                workspace.cleanup(self.logger)
+                for job_index in job_indexes:
+                    del self.aoi_workspaces[job_index]
+
+    def order_by_cost(self, payloads):
+        ''' Orders payloads longest estimated job first from their AOI vertex count and area, and logs the order and estimates '''
+        feature_layer_position = list(self.AST_PARAMETERS.values()).index('feature_layer')
+        ordered, costs = order_longest_first(payloads, feature_layer_position, self.logger)
+        self.job_sizes = {cost.job_index: (cost.vertices, cost.hectares) for cost in costs}
+        self.job_estimates = {cost.job_index: cost.estimate for cost in costs}
+
+        # Similar jobs from earlier batches give a better estimate than the AOI size alone
+        history = self.job_history()
+        payloads_by_index = {payload.job_index: payload for payload in ordered}
+        for cost in costs:
+            estimate = history.estimate_for(self.job_profile(payloads_by_index[cost.job_index])) if history else None
+            if estimate is not None:
+                self.job_estimates[cost.job_index] = estimate
+                self.logger.info(f"Batch Ast: Job {cost.job_index} estimated at {estimate:.0f} seconds from the duration history")
+            elif cost.vertices < 0:
+                self.logger.info(f"Batch Ast: Job {cost.job_index} estimated at {cost.estimate:.0f} seconds (AOI size unknown, batch average used)")
+            else:
+                self.logger.info(f"Batch Ast: Job {cost.job_index} estimated at {cost.estimate:.0f} seconds ({cost.vertices} vertices, {cost.hectares:.1f} ha)")
+
+        # sorted is stable, so jobs with the same estimate keep their order
+        ordered = sorted(ordered, key=lambda payload: self.job_estimates[payload.job_index], reverse=True)
+        self.logger.info(f"Batch Ast: Jobs will start in this order: {[payload.job_index for payload in ordered]}")
+        print(f"Batch Ast: Jobs ordered longest first, total estimate {sum(self.job_estimates.values()) / 3600:.1f} hours of work")
+        return ordered
+
+    def job_history(self):
+        ''' Returns the JobHistory of earlier job durations, None if it can't be opened '''
+        if self._job_history is None:
+            path = os.path.join(self.current_path or os.path.dirname(self.queuefile), self.JOB_HISTORY_FILE)
+            try:
+                self._job_history = JobHistory(path, self.logger)
+            except Exception as e:
+                # The batch runs fine without the history, just with the fixed timeout and AOI size estimates
+                self.logger.warning(f"Batch Ast: Could not open the job duration history {path} - {e}")
+                return None
+        return self._job_history
+
+    def job_profile(self, payload):
+        ''' Returns the JobProfile (region, flags and AOI size) the duration history matches similar jobs on '''
+        names = list(self.AST_PARAMETERS.values())
+        vertices, hectares = self.job_sizes.get(payload.job_index, (-1, -1))
+        return JobProfile(str(payload.params[names.index('region')] or '').lower(),
+                          bool(payload.params[names.index('skip_conflicts_and_constraints')]),
+                          bool(payload.params[names.index('suppress_map_creation')]),
+                          bool(payload.params[names.index('run_as_fcbc')]),
+                          vertices, hectares)
+
+    def job_timeouts(self, payloads):
+        ''' Returns the timeout in seconds of every job the duration history has enough similar jobs for, keyed by job index '''
+        history = self.job_history() if self.ADAPTIVE_TIMEOUTS else None
+        if history is None:
+            return {}
+        timeouts = {}
+        for payload in payloads:
+            timeout = history.timeout_for(self.job_profile(payload), self.TIMEOUT_PERCENTILE, self.TIMEOUT_FACTOR,
+                                          self.MIN_JOB_TIMEOUT, self.job_timeout)
+            if timeout is not None:
+                timeouts[payload.job_index] = timeout
+                self.logger.info(f"Batch Ast: Job {payload.job_index} timeout set to {timeout:.0f} seconds from the duration history")
+        if timeouts:
+            print(f"Batch Ast: {len(timeouts)} jobs have timeouts from the duration history, the rest use {self.job_timeout} seconds")
+        return timeouts
+
+    def record_job_duration(self, payload, duration, condition):
+        ''' Adds a toolbox run to the duration history, called by the supervisor as each job ends '''
+        history = self.job_history()
+        if history is None:
+            return
+        try:
+            history.record(self.job_profile(payload), duration, condition)
+        except Exception as e:
+            self.logger.warning(f"Batch Ast: Could not record the duration of job {payload.job_index} - {e}")
+
+    def result_cache(self):
+        ''' Returns the ResultCache the workers use, None if the result cache is turned off '''
+        if not self.USE_RESULT_CACHE:
+            return None
+        cache_dir = self.RESULT_CACHE_DIR or os.path.join(self.current_path or os.getcwd(), 'autoast_result_cache')
+        names = list(self.AST_PARAMETERS.values())
+        key_positions = {name: names.index(name) for name in self.RESULT_CACHE_PARAMETERS}
+        self.logger.info(f"Batch Ast: Using the result cache in {cache_dir}")
+        return ResultCache(cache_dir, key_positions, self.RESULT_CACHE_MAX_GB * 1024 ** 3, self.RESULT_CACHE_TTL_DAYS * 24 * 3600)
+
+    def retry_payload(self, payload):
+        ''' Returns a copy of the payload with dont_overwrite_outputs set to True, used when a failed job is requeued '''
+        params = list(payload.params)
+        position = list(self.AST_PARAMETERS.values()).index(self.DONT_OVERWRITE_OUTPUTS)
+        params[position] = True
+        return payload._replace(params=tuple(params))
+
+
+# NOTE ** Reload failed jobs may be able to be incorporated into load failed jobs to tighten up the script
+#RELOAD JOBS
+    def re_load_failed_jobs_V2(self, only_rows=None):
+        '''
+        re load failed jobs will check for the existence of the queuefile, if it exists it will load the jobs from the queuefile. Checking if they 
+        are Failed and if they are, will change Dont Overwrite Outputs to True and add them to the jobs list as Queued.
+        only_rows limits the reload to these Excel row numbers, the other rows are left as they are
+        '''
+        set_log_phase('reload')
+        self.logger.info("Re loading Failed Jobs V2.....")
+        # Per row banners and details are only written at DEBUG level, on big queues they cost more than the loading
+        verbose = self.logger.isEnabledFor(logging.DEBUG)
+
+
+        # Initialize the jobs list to store jobs
+        self.jobs = []
+
+        # Check if the queue file exists
+        assert os.path.exists(self.queuefile), "Queue file does not exist"
+        if os.path.exists(self.queuefile):
+
+            # Replay any job results left in the journal by a crashed run before reading the workbook
+            self.flush_job_results()
+
+            try:
+                # Read the sheet once, row by row. Blank rows are skipped by the reader
+                self.logger.info('Re load Failed Jobs: Iterating over each row of data')
+                reader = self.queuefile_reader()
+                for record in reader:
+                    if not self.row_selected(record, only_rows):
+                        continue
+
+                    job_index = record.job_index
+                    job = record.job
+                    ast_condition = record.ast_condition
+                    set_log_job(job_index)
+                    
+                    if verbose:
+                        self.logger.debug("------------------------------------------------------------------------------------")
+                        self.logger.debug("-                        Re Load Failed Jobs: Start of Job %s                               -", job_index)
+                        self.logger.debug("------------------------------------------------------------------------------------")
+
+                    # Keep the spreadsheet job index with the job so results go back to the right row
+                    job[self.JOB_INDEX_KEY] = job_index
+
+                    # Skip if marked as "COMPLETE"
+                    if ast_condition.upper() == 'COMPLETE':
+                        if verbose:
+                            print(f"Re Load Failed Jobs: Skipping job {job_index} as it is marked {ast_condition}.")
+                        self.logger.debug("Re Load Failed Jobs: Adding Complete to dictionary Skipping job %s as it is marked COMPLETE.", job_index)
+                        ast_condition = 'COMPLETE'    
+                    
+                    # Change ast condition to requeued if the job is failed
+                    elif ast_condition.upper() == 'FAILED':
+                        self.logger.info("Re Load Failed Jobs: Requeuing %s as it is marked Failed.", job_index)
+                        ast_condition = 'Requeued'
+                        # The retry keeps what the failed run already wrote, like the retries within a batch (see retry_payload)
+                        job[self.DONT_OVERWRITE_OUTPUTS] = True
+                    
+                    else:
+                        # Its condition is left as it is, so rows that haven't run yet can still be run or resumed later
+                        self.logger.warning("Re Load Failed Jobs: Job %s is not marked as Complete or Failed. Please check the workbook. Skipping this job.", job_index)
+                        continue
+                    
+                    # Assign updated condition to the job dictionary
+                    job[self.AST_CONDITION_COLUMN] = ast_condition
+                    self.logger.debug("Re Load Failed Jobs: Job %s's ast condition has been updated as '%s'", job_index, ast_condition)
+
+                    # Update the Excel sheet with the new condition
+                    try:
+                        self.add_job_result(job_index, ast_condition)
+                        self.logger.debug("Re load Jobs - Added job condition '%s' for job %s to jobs list", ast_condition, job_index)
+                    except Exception as e:
+                        print(f"Error updating Excel sheet at row {job_index}: {e}")
+                        self.logger.error("Re load Jobs - Error updating Excel sheet at row %s: %s", job_index, e)
+                        self.logger.error(traceback.format_exc())
+                        continue
+
+                    # Add the job to the jobs list after all checks and processing
+                    self.jobs.append(job)
+                    self.logger.debug("Re load Jobs - Job Condition is (%s), adding job: %s to jobs list", ast_condition, job_index)
+                    self.logger.debug("Re load Jobs - Job %s dictionary is %s", job_index, job)
+                set_log_job(None)
+
+                print(f"Re Load Failed Jobs - Loaded {len(self.jobs)} jobs, skipped {reader.blank_rows} blank rows")
+                self.logger.info("Re Load Failed Jobs - Loaded %s jobs, skipped %s blank rows", len(self.jobs), reader.blank_rows)
+                            
+            except FileNotFoundError as e:
+                set_log_job(None)
+                print(f"Error: Queue file not found - {e}")
+                self.logger.error(f"Re Load Failed Jobs Error: Queue file not found - {e}")
+                self.logger.error(traceback.format_exc())
+            except Exception as e:
+                set_log_job(None)
+                print(f"Unexpected error re loading jobs: {e}")
+                self.logger.error(f"Re Load Failed Jobs Unexpected error loading jobs: {e}")
+                self.logger.error(traceback.format_exc())
+
+            # Write the Requeued conditions to the workbook in one save
+            self.flush_job_results()
+
+        return self.jobs   
+
+    def create_new_queuefile(self):
+        '''write a new queuefile with preset header'''
+
+        
+        self.logger.info("##########################################################################################################################")
+        self.logger.info("#")
+        self.logger.info("Creating New Queuefile...")
+        self.logger.info("#")
+        self.logger.info("##########################################################################################################################")
+
+        
+        
+        from openpyxl import Workbook
+        wb = Workbook()
+        ws = wb.active
+        ws.title = self.XLSX_SHEET_NAME
+        headers = list(self.AST_PARAMETERS.values())
+        headers.append(self.AST_CONDITION_COLUMN)
+        for h in headers:
+            c = headers.index(h) + 1
+            ws.cell(row=1, column=c).value = h
+        wb.save(self.queuefile)
+
+    
+        
+
+    def capture_arcpy_messages(self):
+        ''' Re assigns the arcpy messages  (0 for all messages, 1 for warnings, and 2 for errors) to variables and passes them to the logger'''
+        
+        backend = get_backend()
+        arcpy_messages = backend.get_messages(0) # Gets all messages
+        arcpy_warnings = backend.get_messages(1) # Gets all warnings only
+        arcpy_errors = backend.get_messages(2) # Gets all errors only
+        
+        if arcpy_messages:
+            self.logger.info(f'ast_toobox arcpy messages: {arcpy_messages}')
+        if arcpy_warnings:
+            self.logger.warning(f'ast_toobox arcpy warnings: {arcpy_warnings}')
+        if arcpy_errors:
+            self.logger.error(f'ast_toobox arcpy errors: {arcpy_errors}')   
\ No newline at end of file
@@ -84,13 +84,10 @@ from openpyxl.styles import Alignment, Font, PatternFill #,Border
 from openpyxl.styles.borders import Border, Side
 
 # import both the statusing tools which create tabs 1, 2, 3
-# sys.path.append(r'\GISWHSE.ENV.GOV.BC.CA\whse_np\corp\script_whse\python\Utility_Misc\Ready\statusing_tools_arcpro\alpha')
-# sys.path.append(r'\\spatialfiles.bcgov\work\srm\nel\Local\Geomatics\Workarea\csostad\GitHubAutoAST\statusing_tools_arcpro\beta')
-# sys.path.append(r'\\GISWHSE.ENV.GOV.BC.CA\WHSE_NP\corp\script_whse\python\Utility_Misc\Ready\statusing_tools_arcpro\Scripts')
-sys.path.append(r'\\spatialfiles.bcgov\work\srm\nel\Local\Geomatics\Workarea\csostad\GitHubAutoAST\statusing_tools_arcpro\Ready')
 # sys.path.append(r'\\spatialfiles.bcgov\work\srm\nel\Local\Geomatics\Workarea\csostad\GitHubAutoAST\gss_authorizations\autoast')
 # sys.path.append(r'\\GISWHSE.ENV.GOV.BC.CA\WHSE_NP\corp\script_whse\python\Utility_Misc\Ready\statusing_tools_arcpro\Scripts')
-# sys.path.append(r'P:\corp\script_whse\python\Utility_Misc\Ready\statusing_tools_arcpro\alpha')
+# autoast passes the statusing tools folder of its profile (when it sets one), the alpha tools are used otherwise
+sys.path.append(os.getenv("AUTOAST_STATUSING_TOOLS") or r'P:\corp\script_whse\python\Utility_Misc\Ready\statusing_tools_arcpro\alpha')
 
 import universal_overlap_tool_arcpro as revolt #@UnresolvedImport
 import one_status_tabs_one_and_two_arcpro as one_status_part2
@@ -205,19 +202,26 @@ def main():
     arcpy.AddMessage("======================================================================")
     arcpy.AddMessage("Checking BCGW Credentials - may take a minute to process...")
 
-    #set the key name that will be used for storing credentials in keyring
-    key_name = config.CONNNAME
-    try:
-        oracleCreds = connect_bcgw.ManageCredentials(key_name, directory_to_store_output)
-        #get sde path location
-        if not oracleCreds.check_credentials():
-            arcpy.AddError("BCGW credentials could not be established.")
+    #autoast passes the pooled connection file it already checked, reuse it instead of building a temporary one for this run
+    shared_sde = os.getenv("AUTOAST_SHARED_SDE")
+    if shared_sde and os.path.exists(shared_sde):
+        arcpy.AddMessage("Using the shared BCGW connection file " + shared_sde)
+        sde = shared_sde
+    else:
+        shared_sde = None
+        #set the key name that will be used for storing credentials in keyring
+        key_name = config.CONNNAME
+        try:
+            oracleCreds = connect_bcgw.ManageCredentials(key_name, directory_to_store_output)
+            #get sde path location
+            if not oracleCreds.check_credentials():
+                arcpy.AddError("BCGW credentials could not be established.")
+                sys.exit()
+            sde = os.getenv("SDE_FILE_PATH")
+
+        except Exception as e:
+            arcpy.AddError(f"Failure occurred when establishing BCGW connection - {e}. Please try again.")
             sys.exit()
-        sde = os.getenv("SDE_FILE_PATH")
-
-    except Exception as e:
-        arcpy.AddError(f"Failure occurred when establishing BCGW connection - {e}. Please try again.")
-        sys.exit()
 
     #Check RAAD connection
     raad = os.path.join(sde, "WHSE_ARCHAEOLOGY.RAAD_TFM_SITE")
@@ -559,12 +563,13 @@ def main():
         arcpy.AddMessage(".")
         arcpy.AddMessage(".")
 
-    #cleanup temporary sde file
-    try:
-        shutil.rmtree(os.path.dirname(os.path.abspath(os.getenv("SDE_FILE_PATH"))))
-        del os.environ["SDE_FILE_PATH"]
-    except Exception as e:
-        pass
+    #cleanup temporary sde file, the shared connection file belongs to autoast and is kept for the next job
+    if not shared_sde:
+        try:
+            shutil.rmtree(os.path.dirname(os.path.abspath(os.getenv("SDE_FILE_PATH"))))
+            del os.environ["SDE_FILE_PATH"]
+        except Exception as e:
+            pass
     
 
 #___________________________________________________________________________
@@ -0,0 +1,76 @@
+###############################################################################################################################################################################
+#
+# Benchmark of the KML AOI reader against geopandas
+#
+# Usage: python -m autoast.benchmark_kml_aoi [kml or kmz files...]   (from the autoast folder)
+#    or: python benchmark_kml_aoi.py [kml or kmz files...]             (from the autoast package folder)
+# With no files, the sample KMLs in the autoast folders are used. Only reading the KML is timed, writing
+# the GDB needs arcpy and is the same for both paths. Import times are measured in a fresh interpreter.
+#
+###############################################################################################################################################################################
+import os
+import sys
+import glob
+import time
+import subprocess
+
+if __package__:
+    from .kml_aoi import read_kml_polygons
+else:
+    # Run as a script, the package is imported from the folder above this one
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from autoast.kml_aoi import read_kml_polygons
+
+REPEATS = 50
+
+
+def cold_import_seconds(statement):
+    ''' Seconds a fresh interpreter takes to run an import statement, None if the import fails '''
+    code = f"import time; start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip())
+
+
+def time_per_call(function, path):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        function(path)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main(paths):
+    if not paths:
+        autoast_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        paths = sorted(glob.glob(os.path.join(autoast_folder, '**', '*.km[lz]'), recursive=True))
+    if not paths:
+        print("Benchmark Kml Aoi: No KML files found")
+        return
+
+    try:
+        import geopandas
+        from fiona.drvsupport import supported_drivers
+        supported_drivers['LIBKML'] = 'rw'
+    except ImportError:
+        geopandas = None
+
+    print(f"Benchmark Kml Aoi: Cold import of kml_aoi: {cold_import_seconds('import autoast.kml_aoi'):.3f} s")
+    geopandas_import = cold_import_seconds('import geopandas')
+    print(f"Benchmark Kml Aoi: Cold import of geopandas: " + (f"{geopandas_import:.3f} s" if geopandas_import is not None else "not installed"))
+
+    for path in paths:
+        placemarks = read_kml_polygons(path)
+        vertices = sum(len(outer) + sum(len(inner) for inner in inners) for placemark in placemarks for outer, inners in placemark.polygons)
+        print(f"\n{path}: {len(placemarks)} polygon placemarks, {vertices} vertices")
+        print(f"    kml_aoi.read_kml_polygons: {time_per_call(read_kml_polygons, path) * 1000:.2f} ms")
+        if geopandas is not None:
+            try:
+                print(f"    geopandas.read_file:       {time_per_call(geopandas.read_file, path) * 1000:.2f} ms")
+            except Exception as e:
+                print(f"    geopandas.read_file:       failed - {e}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,233 @@
+###############################################################################################################################################################################
+#
+# Benchmark of the autoast batch engine
+#
+# Usage: python -m autoast.benchmark_scheduler [--profiles v1,v2,v3] [--sizes 10,100,1000,5000] [--workers N] [--latency SECONDS]
+#                                              [--failure-rate RATE] [--output results.json]   (from the autoast folder)
+# Builds synthetic queuefiles with the ast_config header and runs load_jobs, batch_ast and the status updates on the
+# simulation backend (see gp_backend.py) with each profile, so every job is a stub that sleeps for the given latency.
+# Reports wall time, workbook I/O time, peak RSS and jobs per minute for each profile and queue size and appends the
+# results to a JSON file (benchmark_scheduler_results.json in the working directory by default) so runs from different
+# releases can be compared.
+#
+###############################################################################################################################################################################
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+
+# The backend is picked when it is first used, so the simulation has to be chosen before the factory is imported
+os.environ['AUTOAST_BACKEND'] = 'simulation'
+
+from openpyxl import Workbook
+from .ast_factory import AST_FACTORY
+from .profiles import PROFILES, get_profile
+from .scheduler import RetryPolicy
+from .mp_worker import current_rss_mb
+
+SIZES = [10, 100, 1000, 5000]
+RESULTS_FILE = 'benchmark_scheduler_results.json'
+
+
+class BenchmarkMixin:
+    ''' Mixin for a profile's factory that adds up the time spent reading and saving the queuefile workbook '''
+    USE_RESULT_CACHE = False
+    PROGRESS_PORT = None
+    JOB_MEMORY_MB = None  # Simulated jobs take no memory, reserving it would only hold the workers back
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.workbook_seconds = 0.0
+
+    def flush_job_results(self):
+        start = time.perf_counter()
+        try:
+            return super().flush_job_results()
+        finally:
+            self.workbook_seconds += time.perf_counter() - start
+
+    def queuefile_reader(self):
+        reader = super().queuefile_reader()
+        factory = self
+
+        # Only the time spent inside the reader counts, not the work done on each row in between
+        class TimedReader:
+            def __iter__(self):
+                records = reader.records()
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        record = next(records)
+                    except StopIteration:
+                        factory.workbook_seconds += time.perf_counter() - start
+                        return
+                    factory.workbook_seconds += time.perf_counter() - start
+                    yield record
+
+            def __getattr__(self, name):
+                return getattr(reader, name)
+
+        return TimedReader()
+
+
+def benchmark_factory(profile):
+    ''' The factory class of a profile with the workbook timing of BenchmarkMixin '''
+    factory = get_profile(profile)
+    return type(f"Benchmark{factory.__name__}", (BenchmarkMixin, factory), {})
+
+
+def write_queuefile(path, rows, output_folder):
+    ''' Writes a queuefile with the ast_config header and rows distinct stub jobs, each with its own output directory '''
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(AST_FACTORY.XLSX_SHEET_NAME)
+    header = list(AST_FACTORY.AST_PARAMETERS.values()) + list(AST_FACTORY.ADDITIONAL_PARAMETERS.values())
+    ws.append(header)
+    for row in range(rows):
+        job = {
+            'region': 'cariboo',
+            'feature_layer': os.path.join(output_folder, f'aoi_{row}.shp'),
+            'crown_file_number': f'{row:07d}',
+            'output_directory': os.path.join(output_folder, f'job_{row}'),
+            'output_directory_same_as_input': 'false',
+            'dont_overwrite_outputs': 'false',
+            'skip_conflicts_and_constraints': 'true',
+            'suppress_map_creation': 'true',
+            'add_maps_to_current': 'false',
+            'run_as_fcbc': 'false',
+        }
+        ws.append([job.get(name, '') for name in header])
+    wb.save(path)
+
+
+def peak_rss_mb():
+    ''' Peak resident memory in MB of this process and of its largest finished child (the workers), None if unknown '''
+    try:
+        import resource
+    except ImportError:
+        return current_rss_mb(), None
+    # ru_maxrss is reported in KB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+
+def run_size(rows, workers, logger, profile='v3'):
+    ''' Runs one synthetic queuefile of rows jobs through the batch engine with a profile and returns its measurements '''
+    folder = tempfile.mkdtemp(prefix=f'autoast_benchmark_{rows}_')
+    try:
+        queuefile = os.path.join(folder, f'benchmark_{rows}_jobs.xlsx')
+        write_queuefile(queuefile, rows, folder)
+
+        # Failed jobs go straight back in the queue, backoff would only measure the sleep
+        factory_class = benchmark_factory(profile)
+        factory = factory_class(queuefile, 'user', 'pass', logger, folder, workers,
+                                retry_policy=RetryPolicy(max_attempts=factory_class.MAX_ATTEMPTS, backoff_seconds=0))
+
+        start = time.perf_counter()
+        factory.load_jobs()
+        load_seconds = time.perf_counter() - start
+
+        batch_start = time.perf_counter()
+        results = factory.batch_ast()
+        batch_seconds = time.perf_counter() - batch_start
+        wall_seconds = time.perf_counter() - start
+
+        parent_rss, worker_rss = peak_rss_mb()
+        complete = sum(1 for _, condition in results if condition == 'COMPLETE')
+        return {
+            'profile': profile,
+            'rows': rows,
+            'workers': factory.max_workers,
+            'complete': complete,
+            'failed': len(results) - complete,
+            'wall_seconds': round(wall_seconds, 3),
+            'load_seconds': round(load_seconds, 3),
+            'batch_seconds': round(batch_seconds, 3),
+            'workbook_seconds': round(factory.workbook_seconds, 3),
+            'peak_rss_mb': round(parent_rss, 1) if parent_rss is not None else None,
+            'peak_worker_rss_mb': round(worker_rss, 1) if worker_rss is not None else None,
+            'jobs_per_minute': round(len(results) / wall_seconds * 60, 1) if wall_seconds else None,
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def git_revision():
+    ''' Short hash of the checked out commit, so results can be lined up with releases '''
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def save_results(path, run):
+    ''' Appends this run to the list of runs in the JSON results file '''
+    runs = []
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            runs = json.load(f)
+    runs.append(run)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark of the autoast batch engine on the simulation backend")
+    parser.add_argument('--profiles', default=','.join(PROFILES), help="Comma separated profiles to run (v1, v2, v3)")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in SIZES), help="Comma separated queuefile sizes (rows)")
+    parser.add_argument('--workers', type=int, default=None, help="max_workers for batch_ast, defaults to each profile's setting")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds each stub job takes")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Chance (0 to 1) that a stub job fails")
+    parser.add_argument('--output', default=RESULTS_FILE, help="JSON file the results are appended to, in the working directory by default")
+    args = parser.parse_args(argv)
+
+    # The workers build their own simulation backend from these
+    os.environ['AUTOAST_SIM_LATENCY'] = f"{args.latency},{args.latency}"
+    os.environ['AUTOAST_SIM_FAILURE_RATE'] = str(args.failure_rate)
+
+    # The factory logs a lot for every job, only the benchmark's own output is wanted here
+    logger = logging.getLogger('benchmark_scheduler')
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    run = {
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'latency': args.latency,
+        'failure_rate': args.failure_rate,
+        'results': [],
+    }
+    profiles = [profile.strip() for profile in args.profiles.split(',') if profile.strip()]
+    # Unknown profile names fail here, not after the first profiles have run
+    for profile in profiles:
+        get_profile(profile)
+    for profile in profiles:
+        for rows in [int(size) for size in args.sizes.split(',') if size.strip()]:
+            # The factory prints a line for every job, keep the console for the results
+            with open(os.devnull, 'w') as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    result = run_size(rows, args.workers, logger, profile)
+                finally:
+                    sys.stdout = stdout
+            run['results'].append(result)
+            print(f"Benchmark Scheduler: {profile} {rows} jobs on {result['workers']} workers - wall {result['wall_seconds']:.2f} s, "
+                  f"workbook I/O {result['workbook_seconds']:.2f} s, peak RSS {result['peak_rss_mb']} MB, {result['jobs_per_minute']} jobs/min")
+
+    save_results(args.output, run)
+    print(f"Benchmark Scheduler: Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
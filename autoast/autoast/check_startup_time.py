@@ -0,0 +1,93 @@
+###############################################################################################################################################################################
+#
+# Startup time check for autoast
+#
+# Usage: python -m autoast.check_startup_time [--runs N] [--parent-budget MS] [--worker-budget MS]   (from the autoast folder)
+# Imports the modules the main script (autoast.ast_factory) and every spawned worker (autoast.mp_worker) start with in fresh interpreters
+# and exits with 1 if the median cold start is over budget or a heavy module (openpyxl, tqdm, arcpy, ...) is imported up
+# front again. When a check fails, the slowest imports from python -X importtime are printed to show what to defer.
+#
+###############################################################################################################################################################################
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+
+RUNS = 7
+
+# The fresh interpreters import the package from the folder that holds it
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median cold import budgets in ms, about three times what a dev machine measures so only real regressions fail
+PARENT_BUDGET_MS = 250
+WORKER_BUDGET_MS = 200
+
+# Modules that are only imported where they are used. Workers never read the queuefile, so openpyxl stays out of them too
+DEFERRED_MODULES = ['openpyxl', 'tqdm', 'http.server', 'arcpy', 'geopandas', 'pandas', 'lxml']
+
+CHECKS = [
+    # (name, import statement, budget argument)
+    ('parent', 'import autoast.ast_factory', 'parent_budget'),
+    ('worker', 'import autoast.mp_worker', 'worker_budget'),
+]
+
+
+def cold_import(statement):
+    ''' Runs an import in a fresh interpreter and returns (ms it took, deferred modules it loaded) '''
+    code = (f"import sys, time, json; start = time.perf_counter(); {statement}; "
+            f"print(json.dumps([(time.perf_counter() - start) * 1000, [m for m in {DEFERRED_MODULES!r} if m in sys.modules]]))")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=PACKAGE_PARENT)
+    if result.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed in a fresh interpreter:\n{result.stderr}")
+    ms, loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return ms, loaded
+
+
+def slowest_imports(statement, count=15):
+    ''' The count imports with the largest cumulative time from python -X importtime, as (ms, module) '''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True,
+                            cwd=PACKAGE_PARENT)
+    entries = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        entries.append((int(cumulative) / 1000, module.rstrip()))
+    return sorted(entries, reverse=True)[:count]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Fails if autoast takes too long to start in the main script or a worker")
+    parser.add_argument('--runs', type=int, default=RUNS, help="Fresh interpreters per check, the median is compared to the budget")
+    parser.add_argument('--parent-budget', type=float, default=PARENT_BUDGET_MS, help="Budget in ms for the main script imports")
+    parser.add_argument('--worker-budget', type=float, default=WORKER_BUDGET_MS, help="Budget in ms for the worker imports")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, statement, budget_arg in CHECKS:
+        budget = getattr(args, budget_arg)
+        times, loaded = [], set()
+        for _ in range(args.runs):
+            ms, modules = cold_import(statement)
+            times.append(ms)
+            loaded.update(modules)
+        median = statistics.median(times)
+        over_budget = median > budget
+        print(f"Startup Time: {name} '{statement}' median {median:.1f} ms (min {min(times):.1f}, max {max(times):.1f}) over {args.runs} runs, budget {budget:.0f} ms"
+              f"{' - OVER BUDGET' if over_budget else ''}")
+        if loaded:
+            print(f"Startup Time: {name} imports {', '.join(sorted(loaded))} at startup, these should only be imported where they are used")
+        if over_budget or loaded:
+            failed = True
+            print(f"Startup Time: Slowest imports for {name} (cumulative ms):")
+            for ms, module in slowest_imports(statement):
+                print(f"    {ms:8.1f}  {module}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
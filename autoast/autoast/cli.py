@@ -0,0 +1,159 @@
+###############################################################################################################################################################################
+#
+# autoast command line
+#
+# Usage (from the folder that holds the autoast package):
+#   python -m autoast run QUEUEFILE [QUEUEFILE ...] [--profile v3] [--workers N] [--timeout SECONDS] [--only-rows 2,5-9] [--dry-run]
+#   python -m autoast resume QUEUEFILE [...]          carry on after an interrupted run, Failed rows are left alone
+#   python -m autoast retry-failed QUEUEFILE [...]    run only the Failed rows again, with dont_overwrite_outputs set
+#   python -m autoast status QUEUEFILE [...]          count the rows of each ast_condition, nothing is changed
+#   python -m autoast bench [benchmark_scheduler arguments]
+# The jobs of every queuefile given run in one batch on the same workers. The .env and caches of
+# --folder are used, by default the folder of the first queuefile.
+#
+###############################################################################################################################################################################
+import os
+import sys
+import logging
+import argparse
+from collections import Counter
+
+
+def parse_rows(text):
+    ''' Parses Excel row numbers like "2,5-9" into a set of ints '''
+    rows = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                first, last = (int(value) for value in part.split('-', 1))
+                rows.update(range(first, last + 1))
+            else:
+                rows.add(int(part))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"'{part}' is not a row number or a range like 5-9") from None
+    if any(row < 2 for row in rows):
+        raise argparse.ArgumentTypeError("Row 1 is the header, job rows start at 2")
+    return rows
+
+
+def queuefile_conditions(ast):
+    '''
+    Returns (JobRecord, condition) for every row of a factory's queuefile. The condition includes the results still in
+    the status journal, which the next load writes to the workbook before it reads it.
+    '''
+    journaled = {entry.get('job_index'): entry.get('condition') for entry in ast.journal.pending_entries()}
+    return [(record, journaled.get(record.job_index, record.ast_condition)) for record in ast.queuefile_reader()]
+
+
+def planned(condition, mode):
+    ''' True if a row with this condition is run in mode '''
+    condition = (condition or '').upper()
+    if mode == 'retry-failed':
+        return condition == 'FAILED'
+    if mode == 'resume':
+        return condition not in ('COMPLETE', 'FAILED')
+    return condition != 'COMPLETE'
+
+
+def dry_run(factory, queuefiles, args):
+    ''' Prints the rows each queuefile would run without touching the workbooks, the toolbox or the BCGW '''
+    logger = logging.getLogger('autoast')
+    total = 0
+    for qf in queuefiles:
+        ast = factory(qf, None, None, logger, args.folder, args.workers, job_timeout=args.timeout)
+        rows = [(record, condition) for record, condition in queuefile_conditions(ast)
+                if ast.row_selected(record, args.only_rows) and planned(condition, args.command)]
+        print(f"{qf}: {len(rows)} jobs to {'retry' if args.command == 'retry-failed' else 'run'}")
+        for record, condition in rows:
+            print(f"    row {record.excel_row} (job {record.job_index}): {record.job.get('region', '')} {record.job.get('feature_layer', '')}"
+                  f" [{condition or 'blank'}]")
+        total += len(rows)
+    print(f"Dry run: {total} jobs from {len(queuefiles)} queuefiles with the {factory.PROFILE} profile on at most {ast.max_workers} workers, "
+          f"job timeout {ast.job_timeout} seconds. Nothing was changed")
+    return 0
+
+
+def status(factory, queuefiles, args):
+    ''' Prints how many rows of each queuefile are in each ast_condition '''
+    logger = logging.getLogger('autoast')
+    for qf in queuefiles:
+        ast = factory(qf, None, None, logger, args.folder)
+        conditions = Counter((condition or 'blank') for record, condition in queuefile_conditions(ast)
+                             if ast.row_selected(record, args.only_rows))
+        pending = len(ast.journal.pending_entries())
+        print(f"{qf}: {sum(conditions.values())} jobs - " + ', '.join(f"{condition} {count}" for condition, count in sorted(conditions.items())))
+        if pending:
+            print(f"    {pending} results are in the status journal and not written to the workbook yet")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m autoast', description="Batch processing of the automated status tool")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for command, help_text in [('run', "Run every row that isn't COMPLETE"),
+                               ('resume', "Carry on after an interrupted run, Failed rows are left alone"),
+                               ('retry-failed', "Run the Failed rows again with dont_overwrite_outputs set"),
+                               ('status', "Count the rows of each ast_condition, nothing is changed")]:
+        sub = commands.add_parser(command, help=help_text, description=help_text)
+        sub.add_argument('queuefiles', nargs='+', metavar='QUEUEFILE', help="Queuefile (.xlsx), several run in one batch on the same workers")
+        sub.add_argument('--profile', default='v3', help="autoast profile, v1, v2 or v3 (default v3)")
+        sub.add_argument('--folder', default=None,
+                         help="Folder with the .env and caches, defaults to the folder of the first queuefile")
+        sub.add_argument('--only-rows', type=parse_rows, default=None, metavar='ROWS',
+                         help="Excel row numbers to use, like 2,5-9. The other rows are left as they are")
+        if command != 'status':
+            sub.add_argument('--workers', type=int, default=None, help="Jobs run at the same time, defaults to the profile's setting")
+            sub.add_argument('--timeout', type=int, default=None, metavar='SECONDS',
+                             help="Longest a job may run, defaults to the profile's JOB_TIMEOUT")
+            sub.add_argument('--dry-run', action='store_true', help="List the rows that would run without changing anything")
+            sub.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help="Log file level")
+
+    # Handled before parsing, everything after it goes to benchmark_scheduler
+    commands.add_parser('bench', help="Benchmark the batch engine on the simulation backend (see benchmark_scheduler.py)", add_help=False)
+    return parser
+
+
+def main(argv):
+    if argv and argv[0] == 'bench':
+        # Importing the benchmark switches the process to the simulation backend, so it is only imported here
+        from .benchmark_scheduler import main as bench_main
+        bench_main(argv[1:])
+        return 0
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    from .profiles import get_profile
+    try:
+        factory = get_profile(args.profile)
+    except ValueError as e:
+        parser.error(str(e))
+
+    queuefiles = [os.path.abspath(qf) for qf in args.queuefiles]
+    missing = [qf for qf in queuefiles if not os.path.exists(qf)]
+    if missing:
+        parser.error(f"Queuefile not found: {', '.join(missing)}")
+    args.folder = os.path.abspath(args.folder or os.path.dirname(queuefiles[0]))
+
+    if args.command == 'status':
+        return status(factory, queuefiles, args)
+    if args.dry_run:
+        return dry_run(factory, queuefiles, args)
+
+    from .runner import run_queuefiles
+    results = run_queuefiles(args.profile, queuefiles, args.folder, args.command, args.workers, args.timeout, args.only_rows,
+                             getattr(logging, args.log_level))
+    failed = 0
+    for qf, queuefile_results in results.items():
+        complete = sum(1 for _, condition in queuefile_results if condition == 'COMPLETE')
+        failed += len(queuefile_results) - complete
+        print(f"{qf}: {complete} of {len(queuefile_results)} jobs COMPLETE")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -5,9 +5,17 @@
 ###############################################################################################################################################################################
 import os
 from dotenv import load_dotenv
-import arcpy
+from .gp_backend import get_backend
+from .sde_pool import ConnectionFilePool, SHARED_SDE_ENV, user_connection_folder
+
+BCGW_INSTANCE = 'bcgw.bcgov/idwprod1.bcgov'
+
+# Pool of the run's connection file, set up by setup_bcgw and emptied by release_bcgw
+_pool = None
 
 def setup_bcgw(logger):
+    ''' Sets up the BCGW connection file of the user in the secret file and makes it the workspace. release_bcgw removes it '''
+    global _pool
     # Get the secret file containing the database credentials
     SECRET_FILE = os.getenv('SECRET_FILE')
 
@@ -33,38 +41,19 @@ def setup_bcgw(logger):
         print("Database user and password not found")
         logger.error("Database user and password not found")
 
-    # Define current path of the executing script
-    current_path = os.path.dirname(os.path.realpath(__file__))
-
-    # Create the connection folder
-    connection_folder = 'connection'
-    connection_folder = os.path.join(current_path, connection_folder)
-
-    # Check for the existance of the connection folder and if it doesn't exist, print an error and create a new connection folder
-    if not os.path.exists(connection_folder):
-        print("Connection folder not found, creating new connection folder")
-        logger.info("Connection folder not found, creating new connection folder")
-        os.mkdir(connection_folder)
+    # Reuse the connection file of these credentials from earlier runs, it is only created again if they changed or it stopped connecting
+    # The file stores the login, so it lives in the user's app data folder and not in the repo
+    _pool = ConnectionFilePool(user_connection_folder(), BCGW_INSTANCE, logger)
+    bcgw_con = _pool.get(DB_USER, DB_PASS)
 
-    # Check for an existing bcgw connection, if there is one, remove it
-    if os.path.exists(os.path.join(connection_folder, 'bcgw.sde')):
-        os.remove(os.path.join(connection_folder, 'bcgw.sde'))
+    print(f"db connection ready: {bcgw_con}")
+    logger.info(f"db connection ready: {bcgw_con}")
 
-    # Create a bcgw connection
-    bcgw_con = arcpy.management.CreateDatabaseConnection(connection_folder,
-                                                        'bcgw.sde',
-                                                        'ORACLE',
-                                                        'bcgw.bcgov/idwprod1.bcgov',
-                                                        'DATABASE_AUTH',
-                                                        DB_USER,
-                                                        DB_PASS,
-                                                        'DO_NOT_SAVE_USERNAME')
+    # Workers inherit the environment, so every job uses the same connection file
+    os.environ[SHARED_SDE_ENV] = bcgw_con
 
-    print("new db connection created")
-    logger.info("new db connection created")
-
-
-    arcpy.env.workspace = bcgw_con.getOutput(0)
+    backend = get_backend()
+    backend.set_workspace(bcgw_con)
 
     print("workspace set to bcgw connection")
     logger.info("workspace set to bcgw connection")
@@ -73,3 +62,14 @@ def setup_bcgw(logger):
     
     return secrets
 ###############################################################################################################################################################################
+
+
+def release_bcgw(logger):
+    ''' Removes the connection file set up by setup_bcgw, it holds the BCGW login and mustn't outlive the run '''
+    global _pool
+    if _pool is None:
+        return
+    _pool.remove()
+    os.environ.pop(SHARED_SDE_ENV, None)
+    _pool = None
+    logger.info("BCGW connection file removed")
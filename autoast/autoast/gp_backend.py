@@ -0,0 +1,312 @@
+###############################################################################################################################################################################
+#
+# Geoprocessing backends
+#
+# Everything autoast asks of arcpy goes through a backend, so the scheduling, queuefile and AOI code can run
+# (and be benchmarked) on machines without ArcGIS Pro. The backend is picked with the AUTOAST_BACKEND
+# environment variable: 'arcpy' (default) or 'simulation'.
+#
+###############################################################################################################################################################################
+import os
+import time
+import random
+import hashlib
+import logging
+
+BACKEND_ENV = 'AUTOAST_BACKEND'
+SIMULATION_LATENCY_ENV = 'AUTOAST_SIM_LATENCY'            # "min,max" seconds a simulated status tool run takes
+SIMULATION_FAILURE_RATE_ENV = 'AUTOAST_SIM_FAILURE_RATE'  # 0 to 1, chance a simulated run raises an error
+SIMULATION_SEED_ENV = 'AUTOAST_SIM_SEED'
+
+# Status sheet written by the status tool, also written by the simulation so the output handling can be exercised
+STATUS_SHEET = 'automated_status_sheet.xlsx'
+
+
+class GeoprocessingBackend:
+    ''' The geoprocessing operations autoast uses. Paths returned are strings '''
+    name = ''
+
+    def import_toolbox(self, toolbox, alias):
+        raise NotImplementedError
+
+    def create_database_connection(self, folder, file_name, instance, user, password, save_credentials=False):
+        ''' Creates a database connection file and returns its path. With save_credentials the login is stored in the file '''
+        raise NotImplementedError
+
+    def validate_database_connection(self, path):
+        ''' True if the connection file still connects '''
+        raise NotImplementedError
+
+    def set_workspace(self, workspace, overwrite_output=None):
+        raise NotImplementedError
+
+    def get_workspace(self):
+        raise NotImplementedError
+
+    def spatial_reference(self, dataset):
+        raise NotImplementedError
+
+    def create_feature_class(self, out_path, out_name, geometry, template, spatial_reference):
+        raise NotImplementedError
+
+    def append(self, inputs, target):
+        raise NotImplementedError
+
+    def make_feature_layer(self, dataset, name):
+        raise NotImplementedError
+
+    def layer_to_kml(self, layer, kml):
+        raise NotImplementedError
+
+    def write_polygon_gdb(self, gdb, feature_class, features):
+        '''
+        Creates a new file GDB with a WGS84 polygon feature class holding the features, each a (rings, name, description)
+        tuple with clockwise outer rings and counter-clockwise holes. Returns the path of the feature class.
+        '''
+        raise NotImplementedError
+
+    def aoi_wkb(self, feature_layer):
+        ''' Returns the WKB of every feature in the AOI feature layer '''
+        raise NotImplementedError
+
+    def aoi_size(self, feature_layer):
+        ''' Returns the (vertex count, area in hectares) of the AOI feature layer '''
+        raise NotImplementedError
+
+    def make_status_spreadsheet(self, params):
+        ''' Runs MakeAutomatedStatusSpreadsheet with the parameters in AST_FACTORY.AST_PARAMETERS order '''
+        raise NotImplementedError
+
+    def get_messages(self, severity=0):
+        ''' Messages of the last tool run, 0 for all messages, 1 for warnings and 2 for errors '''
+        raise NotImplementedError
+
+
+class ArcpyBackend(GeoprocessingBackend):
+    ''' Runs everything with arcpy. arcpy is imported when the backend is created, not when this module is imported '''
+    name = 'arcpy'
+
+    def __init__(self) -> None:
+        import arcpy
+        self.arcpy = arcpy
+        self.toolbox = None     # Module of the imported AST toolbox
+        self.toolbox_alias = None
+
+    def import_toolbox(self, toolbox, alias):
+        if not toolbox:
+            raise ImportError("AST Toolbox path not found. Ensure TOOLBOX path is set correctly in environment variables.")
+        self.toolbox = self.arcpy.ImportToolbox(toolbox, alias)
+        self.toolbox_alias = alias
+
+    def create_database_connection(self, folder, file_name, instance, user, password, save_credentials=False):
+        connection = self.arcpy.management.CreateDatabaseConnection(folder,
+                                                                    file_name,
+                                                                    'ORACLE',
+                                                                    instance,
+                                                                    'DATABASE_AUTH',
+                                                                    user,
+                                                                    password,
+                                                                    'SAVE_USERNAME' if save_credentials else 'DO_NOT_SAVE_USERNAME')
+        return connection.getOutput(0)
+
+    def validate_database_connection(self, path):
+        try:
+            # Describing the workspace connects to the database
+            return bool(self.arcpy.Describe(path).connectionProperties)
+        except Exception:
+            return False
+
+    def set_workspace(self, workspace, overwrite_output=None):
+        self.arcpy.env.workspace = workspace
+        if overwrite_output is not None:
+            self.arcpy.env.overwriteOutput = overwrite_output
+
+    def get_workspace(self):
+        return self.arcpy.env.workspace
+
+    def spatial_reference(self, dataset):
+        return self.arcpy.Describe(dataset).spatialReference
+
+    def create_feature_class(self, out_path, out_name, geometry, template, spatial_reference):
+        return self.arcpy.management.CreateFeatureclass(out_path, out_name, geometry, template, "SAME_AS_TEMPLATE", "SAME_AS_TEMPLATE", spatial_reference)
+
+    def append(self, inputs, target):
+        return self.arcpy.management.Append(inputs, target, "NO_TEST")
+
+    def make_feature_layer(self, dataset, name):
+        return self.arcpy.management.MakeFeatureLayer(dataset, name)
+
+    def layer_to_kml(self, layer, kml):
+        self.arcpy.conversion.LayerToKML(layer, kml)
+
+    def write_polygon_gdb(self, gdb, feature_class, features):
+        arcpy = self.arcpy
+        arcpy.management.CreateFileGDB(os.path.dirname(gdb), os.path.basename(gdb))
+        spatial_reference = arcpy.SpatialReference(4326)
+        # KML file names often have characters (like '-') a GDB feature class name can't have
+        feature_class = arcpy.ValidateTableName(feature_class, gdb)
+        fc = arcpy.management.CreateFeatureclass(gdb, feature_class, 'POLYGON', spatial_reference=spatial_reference)[0]
+        arcpy.management.AddField(fc, 'Name', 'TEXT', field_length=255)
+        arcpy.management.AddField(fc, 'Description', 'TEXT', field_length=2000)
+
+        with arcpy.da.InsertCursor(fc, ['SHAPE@', 'Name', 'Description']) as cursor:
+            for rings, name, description in features:
+                parts = arcpy.Array([arcpy.Array([arcpy.Point(x, y) for x, y in ring]) for ring in rings])
+                cursor.insertRow([arcpy.Polygon(parts, spatial_reference), name, description])
+        return fc
+
+    def aoi_wkb(self, feature_layer):
+        with self.arcpy.da.SearchCursor(feature_layer, ['SHAPE@WKB']) as cursor:
+            return [bytes(row[0]) for row in cursor if row[0] is not None]
+
+    def aoi_size(self, feature_layer):
+        vertices = 0
+        area = 0.0
+        with self.arcpy.da.SearchCursor(feature_layer, ['SHAPE@']) as cursor:
+            for row in cursor:
+                shape = row[0]
+                if shape is None:
+                    continue
+                vertices += shape.pointCount - shape.partCount
+                area += shape.getArea('PLANAR', 'HECTARES')
+        return vertices, area
+
+    def make_status_spreadsheet(self, params):
+        # The toolbox is imported under the alias in the .env (alphaast, or ast for the older toolboxes)
+        toolbox = self.toolbox
+        if toolbox is None:
+            alias = self.toolbox_alias or os.getenv('TOOLBOXALIAS')
+            if not alias:
+                raise ImportError("AST Toolbox has not been imported and TOOLBOXALIAS is not set")
+            toolbox = getattr(self.arcpy, alias)
+        toolbox.MakeAutomatedStatusSpreadsheet(*params)
+
+    def get_messages(self, severity=0):
+        return self.arcpy.GetMessages(severity)
+
+
+class SimulationBackend(GeoprocessingBackend):
+    '''
+    Stands in for arcpy without doing any GIS work. A status tool run sleeps for a random time between the
+    latency bounds, fails with the given failure rate and otherwise writes a placeholder status sheet to the
+    output directory. Other operations create empty placeholder files. AOI sizes and WKB are derived from the
+    file path (and contents, if the file exists), so they are the same every time for the same AOI.
+    '''
+    name = 'simulation'
+
+    def __init__(self, latency=(0.0, 0.0), failure_rate=0.0, seed=None, logger=None) -> None:
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.logger = logger or logging.getLogger(__name__)
+        self.workspace = None
+        self.messages = ['', '', '']
+
+    def import_toolbox(self, toolbox, alias):
+        self.logger.info(f"Simulation Backend: Pretending to import toolbox {toolbox} ({alias})")
+
+    def create_database_connection(self, folder, file_name, instance, user, password, save_credentials=False):
+        path = os.path.join(folder, file_name)
+        with open(path, 'w') as f:
+            f.write(f"simulated connection to {instance}\n")
+        return path
+
+    def validate_database_connection(self, path):
+        return os.path.isfile(path)
+
+    def set_workspace(self, workspace, overwrite_output=None):
+        self.workspace = workspace
+
+    def get_workspace(self):
+        return self.workspace
+
+    def spatial_reference(self, dataset):
+        return 'SIMULATED'
+
+    def create_feature_class(self, out_path, out_name, geometry, template, spatial_reference):
+        path = os.path.join(out_path, out_name if out_name.endswith('.shp') or out_path.endswith('.gdb') else out_name + '.shp')
+        open(path, 'w').close()
+        return path
+
+    def append(self, inputs, target):
+        return target
+
+    def make_feature_layer(self, dataset, name):
+        return name
+
+    def layer_to_kml(self, layer, kml):
+        open(kml, 'w').close()
+
+    def write_polygon_gdb(self, gdb, feature_class, features):
+        os.makedirs(gdb, exist_ok=True)
+        path = os.path.join(gdb, feature_class)
+        with open(path, 'w') as f:
+            for rings, name, description in features:
+                f.write(f"{name}\t{rings}\n")
+        return path
+
+    def _digest(self, feature_layer):
+        digest = hashlib.sha256(str(feature_layer).encode('utf-8'))
+        if os.path.isfile(feature_layer):
+            with open(feature_layer, 'rb') as f:
+                digest.update(f.read())
+        return digest.digest()
+
+    def aoi_wkb(self, feature_layer):
+        return [self._digest(feature_layer)]
+
+    def aoi_size(self, feature_layer):
+        digest = self._digest(feature_layer)
+        vertices = int.from_bytes(digest[:2], 'big') % 20000
+        hectares = int.from_bytes(digest[2:4], 'big') % 50000
+        return vertices, float(hectares)
+
+    def make_status_spreadsheet(self, params):
+        low, high = self.latency
+        time.sleep(self.random.uniform(low, high))
+        if self.random.random() < self.failure_rate:
+            self.messages = ['Simulated failure', '', 'Simulated failure']
+            raise RuntimeError("Simulation Backend: Simulated status tool failure")
+
+        # output_directory is parameter 5, the status tool writes beside the input when it is empty
+        output_directory = params[5] if len(params) > 5 and params[5] else None
+        if output_directory:
+            os.makedirs(output_directory, exist_ok=True)
+            with open(os.path.join(output_directory, STATUS_SHEET), 'w') as f:
+                f.write(f"simulated status sheet for {params[:5]}\n")
+        self.messages = ['Simulated status tool run', '', '']
+
+    def get_messages(self, severity=0):
+        return self.messages[severity]
+
+
+_backend = None
+
+
+def simulation_backend_from_env():
+    ''' Builds a SimulationBackend from the AUTOAST_SIM_* environment variables '''
+    latency = [float(value) for value in os.getenv(SIMULATION_LATENCY_ENV, '0,0').split(',')]
+    if len(latency) == 1:
+        latency = latency * 2
+    seed = os.getenv(SIMULATION_SEED_ENV)
+    return SimulationBackend(tuple(latency[:2]), float(os.getenv(SIMULATION_FAILURE_RATE_ENV, '0')), int(seed) if seed else None)
+
+
+def get_backend():
+    ''' Returns the backend of this process, created on first use from the AUTOAST_BACKEND environment variable '''
+    global _backend
+    if _backend is None:
+        name = os.getenv(BACKEND_ENV, 'arcpy').lower()
+        if name == 'simulation':
+            _backend = simulation_backend_from_env()
+        elif name == 'arcpy':
+            _backend = ArcpyBackend()
+        else:
+            raise ValueError(f"Unknown geoprocessing backend '{name}', use 'arcpy' or 'simulation'")
+    return _backend
+
+
+def set_backend(backend):
+    ''' Replaces the backend of this process, e.g. with a SimulationBackend built in code '''
+    global _backend
+    _backend = backend
@@ -0,0 +1,69 @@
+###############################################################################################################################################################################
+#
+# Job cost estimates used to order the batch
+#
+###############################################################################################################################################################################
+import logging
+from typing import NamedTuple
+from .gp_backend import get_backend
+
+# The status tool's runtime grows with the number of AOI vertices (every overlay clips against the AOI outline)
+# and with the AOI area (more features from every dataset intersect it). The weights put both on a rough scale of seconds
+BASE_COST = 600                 # Seconds of fixed overhead for any job (toolbox start up, BCGW connections, writing the workbook)
+VERTEX_COST = 0.05              # Seconds per AOI vertex
+HECTARE_COST = 0.01             # Seconds per hectare of AOI
+
+
+class JobCost(NamedTuple):
+    ''' Cost estimate of one job from its AOI geometry '''
+    job_index: int
+    vertices: int           # vertex count as counted by the call routine (pointCount - partCount), -1 if unknown
+    hectares: float         # AOI area in hectares, -1 if unknown
+    estimate: float         # estimated runtime in seconds
+
+
+def aoi_size(feature_layer):
+    ''' Returns the (vertex count, area in hectares) of all features in an AOI feature class or shapefile '''
+    return get_backend().aoi_size(feature_layer)
+
+
+def estimate_cost(vertices, hectares):
+    ''' Estimated runtime in seconds of a job with an AOI of the given size '''
+    return BASE_COST + VERTEX_COST * vertices + HECTARE_COST * hectares
+
+
+def order_longest_first(payloads, feature_layer_position, logger=None):
+    '''
+    Orders payloads longest estimated job first (LPT scheduling), so the big AOIs don't start last and leave one
+    worker running long after the others have gone idle. Jobs without an AOI feature layer (the AOI is looked up
+    from the crown file number) or whose AOI can't be read are given the average estimate of the jobs that could be measured.
+    Returns the ordered payloads and their JobCost estimates in the same order.
+    '''
+    logger = logger or logging.getLogger(__name__)
+
+    # The same AOI is often used by several jobs, only measure it once
+    sizes = {}
+    costs = {}
+    for payload in payloads:
+        feature_layer = payload.params[feature_layer_position]
+        if not feature_layer:
+            continue
+        if feature_layer not in sizes:
+            try:
+                sizes[feature_layer] = aoi_size(feature_layer)
+            except Exception as e:
+                logger.warning(f"Job Cost: Could not measure the AOI '{feature_layer}' of job {payload.job_index} - {e}")
+                sizes[feature_layer] = None
+        if sizes[feature_layer] is not None:
+            vertices, hectares = sizes[feature_layer]
+            costs[payload.job_index] = JobCost(payload.job_index, vertices, hectares, estimate_cost(vertices, hectares))
+
+    known = [cost.estimate for cost in costs.values()]
+    average = sum(known) / len(known) if known else BASE_COST
+    for payload in payloads:
+        if payload.job_index not in costs:
+            costs[payload.job_index] = JobCost(payload.job_index, -1, -1, average)
+
+    # sorted is stable, so jobs with the same estimate keep their spreadsheet order
+    ordered = sorted(payloads, key=lambda payload: costs[payload.job_index].estimate, reverse=True)
+    return ordered, [costs[payload.job_index] for payload in ordered]
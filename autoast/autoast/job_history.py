@@ -0,0 +1,119 @@
+###############################################################################################################################################################################
+#
+# Job duration history
+#
+# Every job the status tool finishes is recorded in a small SQLite database with its region, flags and AOI size.
+# The durations of similar jobs give each new job its own timeout and a better runtime estimate than the AOI size alone.
+#
+###############################################################################################################################################################################
+import math
+import time
+import sqlite3
+import logging
+from typing import NamedTuple
+
+
+class JobProfile(NamedTuple):
+    ''' What makes two jobs similar. vertices and hectares are -1 when the AOI size isn't known '''
+    region: str
+    skip_conflicts_and_constraints: bool
+    suppress_map_creation: bool
+    run_as_fcbc: bool
+    vertices: int = -1
+    hectares: float = -1
+
+
+class JobHistory:
+    '''
+    JobHistory stores the measured duration of every finished job. Similar jobs have the same region and flags, and
+    if the AOI size is known, an AOI within a factor of SIZE_BAND of its vertex count and area. For runtime estimates,
+    when there aren't MIN_SAMPLES similar jobs of the same size, jobs of any size with the same region and flags are used
+    instead. Timeouts only come from jobs of the same size, a large AOI mustn't get the timeout of the small ones.
+
+    Jobs killed for running past their timeout are recorded as TIMEOUT with the time they had run. That is only a lower
+    bound of how long they needed, so they count towards timeouts (pushing the next timeout past them) but not estimates.
+    '''
+    MIN_SAMPLES = 20        # Similar jobs needed before their durations are trusted
+    SIZE_BAND = 2           # Jobs within this factor of the AOI vertex count and area are the same size
+    MAX_SAMPLES = 500       # Only the most recent similar jobs are used, so the history follows changes to the tool and data
+
+    def __init__(self, path, logger=None) -> None:
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        with self._connect() as con:
+            con.execute('''
+                CREATE TABLE IF NOT EXISTS job_durations (
+                    recorded REAL NOT NULL,
+                    region TEXT NOT NULL,
+                    skip_conflicts_and_constraints INTEGER NOT NULL,
+                    suppress_map_creation INTEGER NOT NULL,
+                    run_as_fcbc INTEGER NOT NULL,
+                    vertices INTEGER NOT NULL,
+                    hectares REAL NOT NULL,
+                    duration REAL NOT NULL,
+                    condition TEXT NOT NULL
+                )''')
+            con.execute('CREATE INDEX IF NOT EXISTS job_durations_profile ON job_durations '
+                        '(region, skip_conflicts_and_constraints, suppress_map_creation, run_as_fcbc, recorded)')
+        con.close()
+
+    def _connect(self):
+        # Used as a context manager the connection commits (or rolls back) but stays open, so it is closed after each use
+        return sqlite3.connect(self.path, timeout=30)
+
+    def record(self, profile, duration, condition='COMPLETE'):
+        ''' Records how long a job ran. COMPLETE jobs are used for timeouts and estimates, TIMEOUT jobs for timeouts only '''
+        with self._connect() as con:
+            con.execute('INSERT INTO job_durations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (time.time(), profile.region, int(profile.skip_conflicts_and_constraints), int(profile.suppress_map_creation),
+                         int(profile.run_as_fcbc), profile.vertices, profile.hectares, duration, condition))
+        con.close()
+
+    def similar_durations(self, profile, conditions=('COMPLETE',), any_size=True):
+        '''
+        Returns the durations of the most recent similar jobs that ended in one of conditions, an empty list if there
+        aren't MIN_SAMPLES of them. Without any_size only jobs of the same size are used, so a job of unknown size gets none.
+        '''
+        query = (f"SELECT duration FROM job_durations WHERE condition IN ({', '.join('?' for _ in conditions)}) AND region = ? "
+                 'AND skip_conflicts_and_constraints = ? AND suppress_map_creation = ? AND run_as_fcbc = ?')
+        args = list(conditions) + [profile.region, int(profile.skip_conflicts_and_constraints), int(profile.suppress_map_creation),
+                                   int(profile.run_as_fcbc)]
+        queries = []
+        if profile.vertices >= 0 and profile.hectares >= 0:
+            queries.append((query + ' AND vertices BETWEEN ? AND ? AND hectares BETWEEN ? AND ?',
+                            args + [profile.vertices / self.SIZE_BAND, profile.vertices * self.SIZE_BAND,
+                                    profile.hectares / self.SIZE_BAND, profile.hectares * self.SIZE_BAND]))
+        if any_size:
+            queries.append((query, args))
+
+        con = self._connect()
+        try:
+            for sql, sql_args in queries:
+                rows = con.execute(sql + ' ORDER BY recorded DESC LIMIT ?', sql_args + [self.MAX_SAMPLES]).fetchall()
+                if len(rows) >= self.MIN_SAMPLES:
+                    return sorted(row[0] for row in rows)
+        finally:
+            con.close()
+        return []
+
+    def timeout_for(self, profile, percentile=99, factor=1.5, minimum=600, maximum=None):
+        '''
+        Timeout for a job, factor times the percentile of the durations of similar jobs of the same size (including the time
+        timed out jobs ran before they were killed) within minimum and maximum. None if there is too little history
+        '''
+        durations = self.similar_durations(profile, ('COMPLETE', 'TIMEOUT'), any_size=False)
+        if not durations:
+            return None
+        timeout = max(minimum, _percentile(durations, percentile) * factor)
+        return min(timeout, maximum) if maximum else timeout
+
+    def estimate_for(self, profile):
+        ''' Expected runtime of a job, the median of similar job durations. None if there is too little history '''
+        durations = self.similar_durations(profile)
+        return _percentile(durations, 50) if durations else None
+
+
+def _percentile(sorted_values, percentile):
+    ''' Nearest rank percentile of an already sorted list '''
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
@@ -0,0 +1,133 @@
+###############################################################################################################################################################################
+#
+# Lightweight KML/KMZ AOI reader
+#
+###############################################################################################################################################################################
+import zipfile
+import logging
+from typing import NamedTuple
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+
+class KmlPlacemark(NamedTuple):
+    ''' A placemark with polygon geometry. Each polygon is (outer ring, [inner rings]), rings are lists of (x, y) '''
+    name: str
+    description: str
+    polygons: list
+
+
+def _local_name(tag):
+    ''' Tag name without its namespace, KMLs come with several different namespaces (kml 2.0, 2.2, gx) '''
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _parse_coordinates(text):
+    ''' Parses a KML coordinates string ("x,y[,z] x,y[,z] ...") into a list of (x, y) '''
+    ring = []
+    for token in (text or '').split():
+        values = token.split(',')
+        if len(values) >= 2:
+            ring.append((float(values[0]), float(values[1])))
+    return ring
+
+
+def _open_kml(path):
+    ''' Opens a KML, or the main KML inside a KMZ, as a binary file object '''
+    if path.lower().endswith('.kmz'):
+        kmz = zipfile.ZipFile(path)
+        names = [name for name in kmz.namelist() if name.lower().endswith('.kml')]
+        if not names:
+            kmz.close()
+            raise ValueError(f"The KMZ file '{path}' does not contain a KML")
+        # doc.kml is the main document by convention, otherwise take the first KML in the archive
+        name = 'doc.kml' if 'doc.kml' in names else names[0]
+        data = kmz.open(name)
+        kmz.close()
+        return data
+    return open(path, 'rb')
+
+
+def read_kml_polygons(path):
+    '''
+    Streams a KML or KMZ with iterparse and returns a KmlPlacemark for every placemark that has polygon geometry,
+    including polygons inside MultiGeometry. Elements are cleared as soon as they are read, so memory stays flat for big files.
+    '''
+    placemarks = []
+    name = description = ''
+    polygons = []
+    outer = None
+    inners = []
+    boundary = None
+
+    with _open_kml(path) as f:
+        for event, element in ET.iterparse(f, events=('start', 'end')):
+            tag = _local_name(element.tag)
+
+            if event == 'start':
+                if tag == 'Placemark':
+                    name, description, polygons = '', '', []
+                elif tag == 'Polygon':
+                    outer, inners = None, []
+                elif tag in ('outerBoundaryIs', 'innerBoundaryIs'):
+                    boundary = tag
+                continue
+
+            if tag == 'coordinates' and boundary is not None:
+                ring = _parse_coordinates(element.text)
+                if boundary == 'outerBoundaryIs':
+                    outer = ring
+                else:
+                    inners.append(ring)
+            elif tag in ('outerBoundaryIs', 'innerBoundaryIs'):
+                boundary = None
+            elif tag == 'Polygon':
+                if outer:
+                    polygons.append((outer, inners))
+                outer, inners = None, []
+            elif tag == 'name':
+                name = (element.text or '').strip()
+            elif tag == 'description':
+                description = (element.text or '').strip()
+            elif tag == 'Placemark':
+                if polygons:
+                    placemarks.append(KmlPlacemark(name, description, polygons))
+                element.clear()
+
+    return placemarks
+
+
+def _signed_area(ring):
+    ''' Shoelace area, positive for counter-clockwise rings '''
+    return sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1])) / 2
+
+
+def _oriented(ring, clockwise):
+    ''' Returns the ring in the requested winding order, Esri polygons want clockwise outer rings and counter-clockwise holes '''
+    if (_signed_area(ring) < 0) != clockwise:
+        return list(reversed(ring))
+    return ring
+
+
+def write_kml_aoi(placemarks, gdb, feature_class, logger=None):
+    '''
+    Writes the placemarks to a new polygon feature class in a new file GDB (WGS84, like every KML), one feature per placemark.
+    Returns the path of the feature class.
+    '''
+    from .gp_backend import get_backend
+
+    logger = logger or logging.getLogger(__name__)
+    features = []
+    for placemark in placemarks:
+        rings = []
+        for outer, inners in placemark.polygons:
+            rings.append(_oriented(outer, clockwise=True))
+            rings.extend(_oriented(inner, clockwise=False) for inner in inners)
+        features.append((rings, placemark.name[:255], placemark.description[:2000]))
+    fc = get_backend().write_polygon_gdb(gdb, feature_class, features)
+
+    logger.info(f"Kml Aoi: Wrote {len(placemarks)} polygon placemarks to {fc}")
+    return fc
@@ -0,0 +1,234 @@
+###############################################################################################################################################################################
+# Set up logging
+#
+# Every process (the main script, the warm workers and the AOI preparation workers) sends its log records down its own
+# pipe to a single listener process, which writes them to the log file as JSON lines with the pid, phase and job_index of
+# each record, so the main script doesn't spend its time on file I/O and each run leaves one log file. The supervisor
+# terminates workers that run past their timeout, with a pipe per process that can only lose the killed worker's own
+# records, where a multiprocessing.Queue shared by every process could be left corrupted or locked.
+
+import os
+import json
+import atexit
+import datetime
+import logging
+import threading
+import contextvars
+import multiprocessing as mp
+import multiprocessing.connection
+from logging.handlers import QueueHandler
+
+# Phase of the run ('load', 'batch', 'flush', 'job', ...) and the job being worked on, stamped on every record
+_phase = contextvars.ContextVar('autoast_log_phase', default=None)
+_job_index = contextvars.ContextVar('autoast_log_job_index', default=None)
+
+_log_channel = None
+_log_pipe = None
+_listener = None
+
+
+class JsonLineFormatter(logging.Formatter):
+    ''' Formats a record as one JSON object per line '''
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'phase': getattr(record, 'phase', None),
+            'job_index': getattr(record, 'job_index', None),
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class ContextFilter(logging.Filter):
+    ''' Stamps the current phase and job index on records that weren't given them with extra= '''
+
+    def filter(self, record):
+        if not hasattr(record, 'phase'):
+            record.phase = _phase.get()
+        if not hasattr(record, 'job_index'):
+            record.job_index = _job_index.get()
+        return True
+
+
+class RecordQueueHandler(QueueHandler):
+    ''' QueueHandler that sends the message with its arguments filled in (tracebacks can't be pickled) and leaves the JSON to the listener '''
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        if record.exc_info:
+            record.msg = f"{record.msg}\n{logging.Formatter().formatException(record.exc_info)}"
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+
+class LogPipe:
+    ''' Sending end of one process's pipe to the listener, the QueueHandler only needs put_nowait '''
+
+    def __init__(self, writer) -> None:
+        self.writer = writer
+        # Threads of the same process share the pipe, so a record is never written in the middle of another one
+        self.lock = threading.Lock()
+
+    def put_nowait(self, record):
+        with self.lock:
+            self.writer.send(record)
+
+    def close(self):
+        self.writer.close()
+
+
+class LogChannel:
+    '''
+    LogChannel is handed to every process that logs. open() gives the calling process its own pipe to the listener, the
+    receiving end is passed to the listener over the control pipe. The control pipe's lock is only held while a process
+    registers its pipe at startup, never while a job runs, so a worker killed at its timeout can't leave it locked.
+    '''
+
+    def __init__(self) -> None:
+        self.listener_end, self.control = mp.Pipe(duplex=False)
+        self.lock = mp.Lock()
+
+    def __getstate__(self):
+        # The processes that log only need the sending end of the control pipe
+        return {'listener_end': None, 'control': self.control, 'lock': self.lock}
+
+    def open(self):
+        ''' Opens a pipe from this process to the listener and returns its LogPipe '''
+        reader, writer = mp.Pipe(duplex=False)
+        with self.lock:
+            self.control.send(reader)
+        reader.close()
+        return LogPipe(writer)
+
+    def close(self):
+        ''' Tells the listener to write what is still waiting and stop '''
+        with self.lock:
+            self.control.send(None)
+
+
+def _listen(control, log_file):
+    ''' Listener process, writes the records from every registered pipe to the log file until the control pipe sends None '''
+    handler = logging.FileHandler(log_file, encoding='utf-8')
+    handler.setFormatter(JsonLineFormatter())
+    readers = [control]
+    stopping = False
+    while readers:
+        # Once stopping, a pipe that stays quiet belongs to a process that hasn't exited yet, don't wait on it
+        ready = multiprocessing.connection.wait(readers, timeout=1 if stopping else None)
+        if not ready:
+            break
+        for conn in ready:
+            try:
+                item = conn.recv()
+            except Exception:
+                # The process has exited, or was killed part way through a record. Only its own pipe is lost
+                readers.remove(conn)
+                conn.close()
+                continue
+            if conn is not control:
+                handler.handle(item)
+            elif item is None:
+                readers.remove(control)
+                stopping = True
+            else:
+                readers.append(item)
+    handler.close()
+
+
+def _pipe_handler(log_pipe):
+    handler = RecordQueueHandler(log_pipe)
+    handler.addFilter(ContextFilter())
+    return handler
+
+
+def setup_logging(level=logging.INFO):
+    '''
+    Set up logging for the script. Records at level and above go to a JSON lines log file in the autoast_logs_YYYYMMDD
+    folder, written by a listener process. Use logging.DEBUG to also log the banners and details of every queuefile row.
+    '''
+    global _log_channel, _log_pipe, _listener
+
+    # Create the log folder filename
+    log_folder = f'autoast_logs_{datetime.datetime.now().strftime("%Y%m%d")}'
+
+    # Create the log folder in the current directory if it doesn't exits
+    if not os.path.exists(log_folder):
+        os.mkdir(log_folder)
+
+    # Check if the log folder was created successfully
+    assert os.path.exists(log_folder), "Error creating log folder, check permissions and path"
+
+    # Create the log file path with the date and time appended
+    log_file = os.path.join(log_folder, f'ast_log_{datetime.datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl')
+
+    # Start the listener process that writes the log file for every process of the run
+    _log_channel = LogChannel()
+    _listener = mp.Process(target=_listen, args=(_log_channel.listener_end, log_file), name='autoast-log-listener', daemon=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    _log_pipe = _log_channel.open()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_pipe_handler(_log_pipe))
+
+    # Create the logger object and set to the current file name
+    logger = logging.getLogger(__name__)
+
+    print("Logging set up")
+    logger.info("Logging set up, writing to %s", log_file)
+
+    return logger
+
+
+def stop_logging():
+    ''' Waits for the listener to write everything that has been logged, then stops it '''
+    global _log_channel, _log_pipe, _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, RecordQueueHandler)]:
+        root.removeHandler(handler)
+    _log_pipe.close()
+    _log_channel.close()
+    _listener.join(timeout=30)
+    _log_channel = None
+    _log_pipe = None
+    _listener = None
+
+
+def log_channel():
+    ''' The LogChannel worker processes open their pipe to the listener with, None if setup_logging hasn't been called in this process '''
+    return _log_channel
+
+
+def log_level():
+    return logging.getLogger().level
+
+
+def setup_worker_logging(channel, level=logging.INFO):
+    ''' Sends the records of a worker process down its own pipe to the listener of the main script, in place of any handlers it inherited '''
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level)
+    root.addHandler(_pipe_handler(channel.open()))
+
+
+def set_log_phase(phase):
+    ''' Sets the phase stamped on the records logged from here on in this process '''
+    _phase.set(phase)
+
+
+def set_log_job(job_index):
+    ''' Sets the job index stamped on the records logged from here on in this process, None for records about no job '''
+    _job_index.set(job_index)
+###############################################################################################################################################################################
@@ -0,0 +1,251 @@
+import os
+import sys
+import time
+import queue
+import datetime
+import logging
+import traceback
+import multiprocessing as mp
+from typing import NamedTuple
+from .gp_backend import get_backend
+from .logging_setup import setup_worker_logging, set_log_phase, set_log_job
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class JobPayload(NamedTuple):
+    '''
+    Everything a worker needs to run one AST job. Built in the parent by AST_FACTORY.job_payload so workers
+    never receive the factory itself (with its jobs list, logger and BCGW credentials).
+    '''
+    job_index: int
+    params: tuple           # MakeAutomatedStatusSpreadsheet parameters in AST_PARAMETERS order, 'true'/'false' already converted to booleans
+    output_directory: str
+
+
+class JobEvent(NamedTuple):
+    '''
+    Structured event a worker pushes onto the result queue. kind is 'started', 'finished' or 'failed', or 'retiring' when
+    the worker recycles itself after the job job_index and takes no more jobs.
+    '''
+    kind: str
+    job_index: int
+    pid: int
+    time: float                 # time.time() when the event happened
+    duration: float = 0.0       # seconds the job ran, for finished and failed events
+    exc_class: str = ''         # exception class name for failed events
+    warning_count: int = 0      # number of arcpy warning messages from the toolbox run
+    message: str = ''
+    cached: bool = False        # True if the outputs were restored from the result cache instead of running the toolbox
+
+
+class ResultQueue:
+    '''
+    Lightweight many-writer, one-reader queue that carries JobEvents from the workers to the supervisor.
+    put() writes the event straight into the pipe (there is no feeder thread like multiprocessing.Queue),
+    so an event is never lost if the worker dies or is killed right after sending it.
+    '''
+
+    def __init__(self) -> None:
+        self._reader, self._writer = mp.Pipe(duplex=False)
+        self._lock = mp.Lock()
+
+    def put(self, event):
+        with self._lock:
+            self._writer.send(event)
+
+    def get(self, timeout=None):
+        ''' Returns the next event, raises queue.Empty if nothing arrives within timeout seconds '''
+        if self._reader.poll(timeout):
+            return self._reader.recv()
+        raise queue.Empty
+
+    def get_nowait(self):
+        return self.get(0)
+
+
+def current_rss_mb():
+    ''' Returns the resident memory of this process in MB, or None if it can't be measured on this machine '''
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        import resource
+        # ru_maxrss is the peak resident size, reported in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+def warm_worker(task_queue, result_queue, current_path, max_jobs=None, max_rss_growth_mb=None, result_cache=None,
+                log_channel=None, log_level=logging.INFO):
+    '''
+    Long lived worker process. Sets up logging and imports arcpy (the geoprocessing backend) and the AST toolbox once, then takes
+    JobPayload tasks from its task queue until it gets None. The worker exits on its own (and the
+    supervisor starts a fresh one) after max_jobs jobs or once its memory has grown by more than
+    max_rss_growth_mb, so arcpy memory leaks can't build up.
+
+    If a result_cache.ResultCache is given, a job whose analysis is already in the cache gets the cached
+    outputs copied into its output directory instead of running the toolbox, and the outputs of every
+    job that does run are added to the cache.
+
+    A 'started' JobEvent is pushed onto the result queue when a job is picked up, then a 'finished'
+    or 'failed' JobEvent when it ends. If arcpy or the toolbox can't be set up, the worker keeps taking jobs and
+    reports each one as failed, so the supervisor retries or fails them instead of starting worker after worker.
+
+    Log records go to the main script's log listener through log_channel (see logging_setup.py). Without one,
+    the worker writes its own log file like it always has.
+    '''
+    pid = mp.current_process().pid
+    logger = logging.getLogger(f"Warm Worker: worker_{pid}")
+
+    if log_channel is not None:
+        setup_worker_logging(log_channel, log_level)
+    else:
+        # Set up logging folder in the worker process
+        log_folder = os.path.join(current_path, f'autoast_logs_{datetime.datetime.now().strftime("%Y%m%d")}')
+        os.makedirs(log_folder, exist_ok=True)
+
+        # Generate a unique log file name per worker process
+        log_file = os.path.join(
+            log_folder,
+            f'ast_worker_log_{datetime.datetime.now().strftime("%Y_%m_%d_%H%M%S")}_{pid}.log'
+        )
+
+        # Set up logging config in the worker process
+        logging.basicConfig(
+            filename=log_file,
+            level=logging.DEBUG,  # Set level to DEBUG to capture all messages
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+    set_log_phase('job')
+
+    logger.info("Warm Worker: Starting warm worker %s", pid)
+
+    # Import arcpy and the toolbox once for every job this worker runs
+    ast_toolbox = os.getenv('TOOLBOX')  # Get the toolbox path from environment variables
+    ast_toolbox_alias = os.getenv('TOOLBOXALIAS')  # Get the toolbox alias from environment variables
+    try:
+        backend = get_backend()
+        backend.import_toolbox(ast_toolbox, ast_toolbox_alias)
+        logger.info("Warm Worker: AST Toolbox imported successfully in worker %s.", pid)
+    except Exception as e:
+        # arcpy didn't import (or has no licence) or the toolbox is missing, every job this worker takes is failed with the reason
+        logger.error("Warm Worker: Could not set up arcpy and the AST toolbox - %s", e)
+        setup_error = e
+    else:
+        setup_error = None
+
+    start_rss = current_rss_mb()
+    jobs_done = 0
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            logger.info("Warm Worker: No more jobs, worker %s shutting down after %s jobs", pid, jobs_done)
+            break
+
+        job_index = task.job_index
+        set_log_job(job_index)
+        started = time.time()
+        result_queue.put(JobEvent('started', job_index, pid, started))
+        print(f"Warm Worker {pid}: Processing job {job_index}")
+
+        try:
+            if setup_error is not None:
+                raise ImportError(f"arcpy and the AST toolbox could not be set up in this worker - {setup_error}")
+            cache_key = result_cache_key(result_cache, task, logger)
+            if cache_key and result_cache.restore(cache_key, task.output_directory, logger):
+                warning_count, cached = 0, True
+            else:
+                warning_count, cached = process_job_mp(task, logger), False
+                if cache_key:
+                    result_cache.store(cache_key, task.output_directory, logger)
+            # Indicate success
+            result_queue.put(JobEvent('finished', job_index, pid, time.time(), time.time() - started, warning_count=warning_count, cached=cached))
+        except Exception as e:
+            # Indicate failure
+            result_queue.put(JobEvent('failed', job_index, pid, time.time(), time.time() - started, type(e).__name__, message=str(e)))
+            exc_type, exc_value, exc_traceback = sys.exc_info()
+            traceback_str = ''.join(traceback.format_exception(exc_type, exc_value, exc_traceback))
+            logger.error("Warm Worker: Job %s failed with error: %s", job_index, e)
+            logger.error("Warm Worker: Traceback:\n%s", traceback_str)
+        set_log_job(None)
+        jobs_done += 1
+
+        # Recycle the worker before leaked memory builds up. The supervisor is told first so it stops sending jobs here
+        rss = current_rss_mb()
+        if max_jobs and jobs_done >= max_jobs:
+            logger.info("Warm Worker: Worker %s ran %s jobs, recycling", pid, jobs_done)
+        elif max_rss_growth_mb and start_rss is not None and rss is not None and rss - start_rss > max_rss_growth_mb:
+            logger.info("Warm Worker: Worker %s memory grew %.0f MB after %s jobs, recycling", pid, rss - start_rss, jobs_done)
+        else:
+            continue
+        result_queue.put(JobEvent('retiring', job_index, pid, time.time()))
+        break
+
+
+def result_cache_key(result_cache, payload, logger):
+    ''' Returns the result cache key of a job, None if there is no cache or the job can't be cached '''
+    if result_cache is None:
+        return None
+    try:
+        return result_cache.job_key(payload)
+    except Exception as e:
+        # A broken cache must never fail the job, it just runs the toolbox
+        logger.warning("Warm Worker: Could not build the result cache key for job %s - %s", payload.job_index, e)
+        return None
+
+
+def process_job_mp(payload, logger):
+    '''
+    Runs one AST job in the current worker process. The AST toolbox must already be imported.
+    Returns the number of arcpy warnings from the run, raises an exception if the job fails.
+    '''
+    backend = get_backend()
+
+    job_index = payload.job_index
+    params = list(payload.params)
+    logger.info("Process Job Mp: Worker process %s started job %s", mp.current_process().pid, job_index)
+
+    #NOTE: This is where the output directory is set
+    output_directory = payload.output_directory
+
+    # Create the output directory if the user put in a path but failed to create the output directory in Windows explorer
+    if output_directory and not os.path.exists(output_directory):
+        try:
+            os.makedirs(output_directory)
+            print(f"Output directory '{output_directory}' created.")
+            logger.warning("Process Job Mp: Output directory doesn't exist for job (%s), '%s' created.", job_index, output_directory)
+        except OSError as e:
+            raise RuntimeError(f"Failed to create the output directory '{output_directory}'. Check your permissions: {e}")
+
+
+    # Ensure that region has been entered otherwise job will fail (region is the first AST parameter)
+    if not params[0]:
+        raise ValueError("Process Job Mp: Region is required and was not provided. Job Failed")
+
+    # Log the parameters being used
+    logger.debug("Process Job Mp: Job Parameters: %s", params)
+
+    # Run the ast tool
+    logger.info("Process Job Mp: Running MakeAutomatedStatusSpreadsheet_ast...")
+    backend.make_status_spreadsheet(params)
+    logger.info("Process Job Mp: MakeAutomatedStatusSpreadsheet_ast completed successfully.")
+
+    # Capture and log arcpy messages
+    logger.info("Process Job Mp: Capturing arcpy messages...")
+    arcpy_messages = backend.get_messages(0)
+    arcpy_warnings = backend.get_messages(1)
+    arcpy_errors = backend.get_messages(2)
+
+    if arcpy_messages:
+        logger.info('arcpy messages: %s', arcpy_messages)
+    if arcpy_warnings:
+        logger.warning('arcpy warnings: %s', arcpy_warnings)
+    if arcpy_errors:
+        logger.error('arcpy errors: %s', arcpy_errors)
+
+    return len(arcpy_warnings.splitlines()) if arcpy_warnings else 0
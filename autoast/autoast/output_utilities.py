@@ -0,0 +1,73 @@
+###############################################################################################################################################################################
+#
+# Helpers for AST job outputs
+#
+###############################################################################################################################################################################
+import os
+import json
+import shutil
+import hashlib
+import logging
+
+# Outputs of the status tool that are shared between jobs running the same analysis
+AST_OUTPUT_WORKBOOK = 'automated_status_sheet.xlsx'
+AST_OUTPUT_GDB = 'aoi_boundary.gdb'
+
+# Everything the status tool writes to an output directory that is worth keeping in the result cache
+AST_OUTPUTS = [
+    AST_OUTPUT_WORKBOOK,
+    AST_OUTPUT_GDB,
+    'one_status_common_datasets_aoi.xlsx',
+    'one_status_tabs_1_and_2.xlsx',
+]
+
+
+def analysis_key(values):
+    ''' Returns a stable hash of the analysis-relevant parameter values of a job '''
+    normalized = [str(v).strip().lower() if v is not None else '' for v in values]
+    return hashlib.sha256(json.dumps(normalized).encode('utf-8')).hexdigest()
+
+
+def _link_or_copy(src, dst):
+    ''' Hard links src to dst, falling back to a copy when linking isn't possible (e.g. across drives or shares) '''
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def copy_ast_outputs(source_directory, target_directory, hard_link=False, logger=None, outputs=None):
+    '''
+    Copies the automated status sheet and the AOI GDB (or the given list of outputs) from the output directory
+    of a finished job into another output directory. With hard_link the files are linked instead of copied where
+    the file system allows it. Outputs that don't exist in the source are skipped, but raises FileNotFoundError if
+    the source has no status sheet.
+    '''
+    logger = logger or logging.getLogger(__name__)
+    copy_function = _link_or_copy if hard_link else shutil.copy2
+    outputs = outputs or [AST_OUTPUT_WORKBOOK, AST_OUTPUT_GDB]
+
+    source_workbook = os.path.join(source_directory, AST_OUTPUT_WORKBOOK)
+    if not os.path.isfile(source_workbook):
+        raise FileNotFoundError(f"'{source_workbook}' was not created by the original job")
+
+    os.makedirs(target_directory, exist_ok=True)
+
+    for name in outputs:
+        source = os.path.join(source_directory, name)
+        target = os.path.join(target_directory, name)
+
+        if os.path.isdir(source):
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            # Skip the lock files of any process that still has the GDB open
+            shutil.copytree(source, target, copy_function=copy_function, ignore=shutil.ignore_patterns('*.lock'))
+
+        elif os.path.isfile(source):
+            if os.path.exists(target):
+                os.remove(target)
+            copy_function(source, target)
+
+        else:
+            continue
+        logger.info(f"Output Utilities: Copied {source} to {target}")
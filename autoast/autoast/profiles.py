@@ -0,0 +1,54 @@
+###############################################################################################################################################################################
+#
+# autoast profiles
+#
+# The V1 (ToastMaster), V2 (Cuisinart) and V3 (Breville) folders used to carry their own copies of AST_FACTORY, the worker,
+# setup_bcgw and the call routine. They now all run on this package and only differ in the settings below. Each folder
+# keeps its own .env (toolbox, template, secrets) and queuefiles, and a launcher that picks its profile.
+#
+###############################################################################################################################################################################
+from .ast_factory import AST_FACTORY
+
+# Environment variable that tells the status tool script embedded in the toolbox (run in the workers) where the statusing tools are
+STATUSING_TOOLS_ENV = 'AUTOAST_STATUSING_TOOLS'
+
+
+class ToastMasterFactory(AST_FACTORY):
+    '''
+    V1 profile: one job at a time in queuefile order, failed jobs are run once more. The result cache, the duration
+    history and the progress server aren't used, every job is run by the status tool as the queuefile says.
+    '''
+    PROFILE = 'v1'
+    MAX_WORKERS = 1
+    ORDER_BY_COST = False
+    USE_RESULT_CACHE = False
+    ADAPTIVE_TIMEOUTS = False
+    PROGRESS_PORT = None
+
+
+class CuisinartFactory(AST_FACTORY):
+    '''
+    V2 profile: jobs run in parallel (one per core) in queuefile order with the 6 hour timeout, failed jobs are run once more.
+    Like V1 it doesn't use the result cache, the duration history or the progress server.
+    '''
+    PROFILE = 'v2'
+    ORDER_BY_COST = False
+    USE_RESULT_CACHE = False
+    ADAPTIVE_TIMEOUTS = False
+    PROGRESS_PORT = None
+
+
+class BrevilleFactory(AST_FACTORY):
+    ''' V3 profile: every AST_FACTORY feature with its default settings '''
+    PROFILE = 'v3'
+
+
+PROFILES = {factory.PROFILE: factory for factory in (ToastMasterFactory, CuisinartFactory, BrevilleFactory)}
+
+
+def get_profile(name):
+    ''' Returns the factory class of a profile name ('v1', 'v2' or 'v3') '''
+    try:
+        return PROFILES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown autoast profile '{name}', use one of {', '.join(PROFILES)}") from None
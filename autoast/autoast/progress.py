@@ -0,0 +1,211 @@
+###############################################################################################################################################################################
+#
+# Live batch progress
+#
+# The job supervisor reports every job event to a BatchProgress, which keeps the counts, running jobs, throughput and ETA.
+# They are shown as a terminal progress bar (tqdm if it is installed, a status line otherwise) and served as JSON on
+# http://127.0.0.1:<port>/ while the batch runs.
+#
+###############################################################################################################################################################################
+import json
+import time
+import logging
+import threading
+
+
+class BatchProgress:
+    '''
+    BatchProgress follows a batch from the supervisor's job events. The ETA adds up the expected time of every job
+    that isn't done, spread over the workers. A job's expected time is the average duration of the jobs in its region
+    that have finished in this batch, or its estimate (from the duration history or the AOI size, see AST_FACTORY.order_by_cost)
+    until a job in that region has finished.
+    '''
+    # Seconds between status lines when tqdm isn't installed
+    PRINT_INTERVAL = 60
+
+    def __init__(self, max_workers, port=None, logger=None) -> None:
+        self.max_workers = max_workers
+        self.port = port
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.started = None
+        # job index -> region, estimate (seconds), state and start time of every job in the batch
+        self.jobs = {}
+        # region -> [finished job count, total seconds]
+        self.region_durations = {}
+        self.counts = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0, 'retried': 0}
+        self.server = None
+        self.bar = None
+        self.last_print = 0
+
+    def start(self, payloads, estimates=None, region_position=0):
+        ''' Registers the jobs of the batch, estimates maps job index -> expected seconds. Starts the HTTP endpoint and the progress bar '''
+        estimates = estimates or {}
+        with self.lock:
+            self.started = time.time()
+            for payload in payloads:
+                self.jobs[payload.job_index] = {
+                    'region': str(payload.params[region_position] or ''),
+                    'estimate': estimates.get(payload.job_index),
+                    'state': 'queued',
+                    'started': None,
+                }
+            self.counts['queued'] = len(self.jobs)
+
+        if self.port:
+            # The HTTP server and tqdm are only imported when a batch actually starts
+            from http.server import ThreadingHTTPServer
+            try:
+                self.server = ThreadingHTTPServer(('127.0.0.1', self.port), _handler(self))
+                threading.Thread(target=self.server.serve_forever, name='autoast-progress', daemon=True).start()
+                print(f"Batch Progress: Progress is available at http://127.0.0.1:{self.port}/")
+                self.logger.info(f"Batch Progress: Serving progress at http://127.0.0.1:{self.port}/")
+            except OSError as e:
+                # Another batch may already have the port, the batch runs without the endpoint
+                self.server = None
+                self.logger.warning(f"Batch Progress: Could not serve progress on port {self.port} - {e}")
+
+        try:
+            from tqdm import tqdm
+            self.bar = tqdm(total=len(self.jobs), desc='AST jobs', unit='job')
+        except ImportError:
+            self.bar = None
+
+    def job_started(self, job_index, started):
+        with self.lock:
+            job = self._job(job_index)
+            self._leave_state(job)
+            job['state'] = 'running'
+            self.counts['running'] += 1
+            job['started'] = started
+
+    def job_requeued(self, job_index):
+        with self.lock:
+            job = self._job(job_index)
+            self._leave_state(job)
+            job['state'] = 'queued'
+            job['started'] = None
+            self.counts['queued'] += 1
+            self.counts['retried'] += 1
+
+    def job_finished(self, job_index, condition, now):
+        ''' Records the final condition of a job. Only jobs that ran through the toolbox count towards the region averages '''
+        with self.lock:
+            job = self._job(job_index)
+            if job['started'] is not None and condition == 'COMPLETE':
+                region = self.region_durations.setdefault(job['region'], [0, 0.0])
+                region[0] += 1
+                region[1] += now - job['started']
+            self._leave_state(job)
+            job['state'] = 'done' if condition == 'COMPLETE' else 'failed'
+            self.counts[job['state']] += 1
+        if self.bar is not None:
+            self.bar.update(1)
+
+    def refresh(self):
+        ''' Updates the terminal view, called from the supervisor loop '''
+        snapshot = self.snapshot()
+        if self.bar is not None:
+            self.bar.set_postfix(running=snapshot['running'], failed=snapshot['failed'], eta=_format_seconds(snapshot['eta_seconds']), refresh=True)
+        elif time.time() - self.last_print >= self.PRINT_INTERVAL:
+            self.last_print = time.time()
+            print(self.status_line(snapshot))
+
+    def stop(self):
+        ''' Closes the progress bar and the HTTP endpoint and logs the final status '''
+        if self.bar is not None:
+            self.bar.close()
+            self.bar = None
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.logger.info(self.status_line())
+
+    def snapshot(self):
+        ''' Returns the batch progress as a JSON serialisable dictionary '''
+        with self.lock:
+            now = time.time()
+            elapsed = now - self.started if self.started else 0
+            finished = self.counts['done'] + self.counts['failed']
+            running = [
+                {'job_index': job_index, 'region': job['region'], 'elapsed_seconds': round(now - job['started'], 1)}
+                for job_index, job in self.jobs.items() if job['state'] == 'running'
+            ]
+            return {
+                'total': len(self.jobs),
+                'queued': self.counts['queued'],
+                'running': self.counts['running'],
+                'done': self.counts['done'],
+                'failed': self.counts['failed'],
+                'retried': self.counts['retried'],
+                'elapsed_seconds': round(elapsed, 1),
+                'jobs_per_hour': round(finished / elapsed * 3600, 2) if elapsed > 0 else None,
+                'eta_seconds': self._eta(now),
+                'running_jobs': running,
+                'region_average_seconds': {region: round(total / count, 1) for region, (count, total) in self.region_durations.items()},
+            }
+
+    def status_line(self, snapshot=None):
+        snapshot = snapshot or self.snapshot()
+        return (f"Batch Progress: {snapshot['done']} done, {snapshot['failed']} failed, {snapshot['running']} running, "
+                f"{snapshot['queued']} queued of {snapshot['total']} - ETA {_format_seconds(snapshot['eta_seconds'])}")
+
+    def _job(self, job_index):
+        # Jobs that weren't registered up front (shouldn't happen) are tracked from their first event
+        return self.jobs.setdefault(job_index, {'region': '', 'estimate': None, 'state': 'new', 'started': None})
+
+    def _leave_state(self, job):
+        if job['state'] in ('queued', 'running', 'done', 'failed'):
+            self.counts[job['state']] -= 1
+
+    def _expected(self, job):
+        ''' Expected seconds of a job from its region's average in this batch, its estimate, or the average of every finished job '''
+        count, total = self.region_durations.get(job['region'], (0, 0.0))
+        if count:
+            return total / count
+        if job['estimate'] is not None:
+            return job['estimate']
+        count = sum(c for c, _ in self.region_durations.values())
+        return sum(t for _, t in self.region_durations.values()) / count if count else None
+
+    def _eta(self, now):
+        ''' Seconds until the batch is expected to finish, None until there is something to base it on '''
+        remaining = 0.0
+        for job in self.jobs.values():
+            if job['state'] not in ('queued', 'running'):
+                continue
+            expected = self._expected(job)
+            if expected is None:
+                return None
+            if job['state'] == 'running':
+                expected = max(0.0, expected - (now - job['started']))
+            remaining += expected
+        return round(remaining / max(1, self.max_workers), 1)
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return '?'
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+def _handler(progress):
+    ''' Request handler class that answers every GET with the progress snapshot '''
+    from http.server import BaseHTTPRequestHandler
+
+    class ProgressHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(progress.snapshot(), indent=2).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep requests out of the console
+            progress.logger.debug(f"Batch Progress: {self.address_string()} {format % args}")
+
+    return ProgressHandler
@@ -0,0 +1,80 @@
+###############################################################################################################################################################################
+#
+# Streaming queuefile reader
+#
+###############################################################################################################################################################################
+import logging
+from typing import NamedTuple
+
+
+class JobRecord(NamedTuple):
+    ''' One non-blank row of the queuefile '''
+    job_index: int          # 0 based index of the data row, the first row under the header is job 0
+    excel_row: int          # 1 based row number in the Excel sheet
+    job: dict               # column header -> cell value, empty cells are ""
+    ast_condition: str      # value of the ast_condition column, "" if empty
+
+
+class QueueFileReader:
+    '''
+    QueueFileReader makes a single pass over the queuefile sheet in read-only mode and yields a JobRecord
+    for every non-blank row as it is read. While reading it builds row_index, a map of job_index to Excel
+    row, so nothing has to re-scan the sheet to find where a job lives.
+    '''
+
+    def __init__(self, queuefile, sheet_name, condition_column, logger=None) -> None:
+        self.queuefile = queuefile
+        self.sheet_name = sheet_name
+        self.condition_column = condition_column
+        self.logger = logger or logging.getLogger(__name__)
+        self.header = []
+        self.row_index = {}
+        self.blank_rows = 0
+
+    def __iter__(self):
+        return self.records()
+
+    def records(self):
+        ''' Yields a JobRecord for every non-blank data row, skipping blank rows '''
+        self.row_index = {}
+        self.blank_rows = 0
+
+        # Imported here so modules that only need JobRecord don't pay for openpyxl
+        from openpyxl import load_workbook
+        wb = load_workbook(filename=self.queuefile, read_only=True)
+        try:
+            ws = wb[self.sheet_name]
+            rows = ws.iter_rows(values_only=True)
+
+            # Get the header (column names) from the first row of the sheet
+            self.header = list(next(rows, ()))
+
+            # Read the data rows (starting from the second row to skip the header) one at a time
+            for job_index, row_data in enumerate(rows):
+
+                # Skip any completely blank rows
+                if all((value is None or str(value).strip() == '') for value in row_data):
+                    self.blank_rows += 1
+                    continue
+
+                job = {}
+                ast_condition = ''
+                for key, value in zip(self.header, row_data):
+                    if key is None:
+                        continue
+                    # Assign an empty string to any None values
+                    value = "" if value is None else value
+                    if key.lower() == self.condition_column.lower():
+                        ast_condition = str(value)
+                    job[key] = value
+
+                excel_row = job_index + 2  # +2 to account for the header row and Excel rows starting at 1
+                self.row_index[job_index] = excel_row
+                yield JobRecord(job_index, excel_row, job, ast_condition)
+        finally:
+            # Read-only workbooks keep the file open until they are closed
+            wb.close()
+
+        # The caller is still on the last row when the generator finishes, this record isn't about that job
+        self.logger.info("Queuefile Reader: Read %s jobs and skipped %s blank rows from %s", len(self.row_index), self.blank_rows, self.queuefile,
+                         extra={'job_index': None})
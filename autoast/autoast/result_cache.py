@@ -0,0 +1,178 @@
+###############################################################################################################################################################################
+#
+# Content-addressed cache of status tool results
+#
+###############################################################################################################################################################################
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+from .output_utilities import AST_OUTPUTS, AST_OUTPUT_WORKBOOK, copy_ast_outputs
+from .gp_backend import get_backend
+
+# Input spreadsheets the status tool reads its analysis from, see automated_status_sheet_call_routine_arcpro.py
+ANALYSIS_INPUT_FOLDER = r"\\giswhse.env.gov.bc.ca\whse_np\corp\script_whse\python\Utility_Misc\Ready\statusing_tools_arcpro\statusing_input_spreadsheets"
+
+
+def analysis_input_spreadsheets(region):
+    ''' Returns the analysis input spreadsheets the status tool uses for a region '''
+    region = str(region).lower()
+    if region == 'debug_do_not_use':
+        return [
+            os.path.join(ANALYSIS_INPUT_FOLDER, 'one_status_common_datasets_debug_version.xlsx'),
+            os.path.join(ANALYSIS_INPUT_FOLDER, 'one_status_cariboo_specific_debug_version.xlsx'),
+        ]
+    return [
+        os.path.join(ANALYSIS_INPUT_FOLDER, 'one_status_common_datasets.xlsx'),
+        os.path.join(ANALYSIS_INPUT_FOLDER, f'one_status_{region}_specific.xlsx'),
+    ]
+
+
+def file_fingerprint(path):
+    ''' Size and modified time of a file, so an edited input spreadsheet gives a new cache key without hashing its contents '''
+    try:
+        stat = os.stat(path)
+        return [path, stat.st_size, int(stat.st_mtime)]
+    except OSError:
+        return [path, 'missing']
+
+
+def aoi_geometry_digest(feature_layer):
+    ''' Hashes the WKB of every AOI feature in the feature layer '''
+    digest = hashlib.sha256()
+    for wkb in get_backend().aoi_wkb(feature_layer):
+        digest.update(wkb)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    '''
+    ResultCache keeps the outputs of finished status tool runs in a local cache directory, keyed by a hash of the
+    AOI geometry, the parameters that change the report and the analysis input spreadsheets. A worker that gets a
+    cache hit copies the outputs into the job's output directory instead of calling the toolbox.
+
+    Entries older than ttl_seconds are stale and never restored. When the cache grows past max_bytes the least
+    recently used entries are removed.
+    '''
+    ENTRY_FILE = 'entry.json'
+
+    def __init__(self, cache_dir, key_positions, max_bytes=20 * 1024 ** 3, ttl_seconds=7 * 24 * 3600) -> None:
+        self.cache_dir = cache_dir
+        # AST parameter name -> position in JobPayload.params for the parameters that make up the key
+        self.key_positions = dict(key_positions)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+    def job_key(self, payload):
+        '''
+        Returns the cache key of a job, or None if the job can't be cached: it has no AOI feature layer (the AOI is looked
+        up from the crown file number), no output directory to restore into, or it creates maps (only the AST_OUTPUTS are
+        cached, so a hit would leave the job without its maps).
+        '''
+        params = payload.params
+        feature_layer = params[self.key_positions['feature_layer']]
+        if not feature_layer or not payload.output_directory:
+            return None
+        if 'suppress_map_creation' in self.key_positions and str(params[self.key_positions['suppress_map_creation']]).lower() != 'true':
+            return None
+
+        region = params[self.key_positions['region']]
+        key = {
+            'aoi': aoi_geometry_digest(feature_layer),
+            'parameters': {name: str(params[position]).lower() for name, position in sorted(self.key_positions.items()) if name != 'feature_layer'},
+            'inputs': [file_fingerprint(path) for path in analysis_input_spreadsheets(region)],
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _read_entry(self, entry_path):
+        with open(os.path.join(entry_path, self.ENTRY_FILE), encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_entry(self, entry_path, entry):
+        tmp = os.path.join(entry_path, self.ENTRY_FILE + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp, os.path.join(entry_path, self.ENTRY_FILE))
+
+    def restore(self, key, output_directory, logger=None):
+        ''' Copies a cached result into output_directory. Returns True on a hit, False if there is no fresh entry '''
+        logger = logger or logging.getLogger(__name__)
+        entry_path = self._entry_path(key)
+        try:
+            entry = self._read_entry(entry_path)
+        except (OSError, ValueError):
+            return False
+
+        if time.time() - entry['created'] > self.ttl_seconds:
+            logger.info(f"Result Cache: Entry {key} is stale, removing it")
+            shutil.rmtree(entry_path, ignore_errors=True)
+            return False
+
+        try:
+            copy_ast_outputs(entry_path, output_directory, logger=logger, outputs=AST_OUTPUTS)
+        except OSError as e:
+            logger.warning(f"Result Cache: Could not restore entry {key} - {e}")
+            return False
+
+        entry['last_used'] = time.time()
+        self._write_entry(entry_path, entry)
+        logger.info(f"Result Cache: Restored entry {key} into {output_directory}")
+        return True
+
+    def store(self, key, output_directory, logger=None):
+        ''' Copies the outputs of a finished job into the cache, then evicts old entries if the cache is over its size limit '''
+        logger = logger or logging.getLogger(__name__)
+        if not os.path.isfile(os.path.join(output_directory, AST_OUTPUT_WORKBOOK)):
+            return
+
+        entry_path = self._entry_path(key)
+        if os.path.exists(entry_path):
+            return
+
+        # Build the entry under a temporary name and rename it into place, so other workers never see half an entry
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            copy_ast_outputs(output_directory, tmp_path, logger=logger, outputs=AST_OUTPUTS)
+            size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path) for name in names)
+            now = time.time()
+            self._write_entry(tmp_path, {'created': now, 'last_used': now, 'size': size})
+            os.rename(tmp_path, entry_path)
+            logger.info(f"Result Cache: Stored entry {key} ({size / 1024 ** 2:.1f} MB)")
+        except OSError as e:
+            logger.warning(f"Result Cache: Could not store entry {key} - {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return
+
+        self.evict(logger)
+
+    def evict(self, logger=None):
+        ''' Removes stale entries, then the least recently used entries until the cache fits in max_bytes '''
+        logger = logger or logging.getLogger(__name__)
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                entry = self._read_entry(entry_path)
+            except (OSError, ValueError):
+                continue
+            if now - entry['created'] > self.ttl_seconds:
+                shutil.rmtree(entry_path, ignore_errors=True)
+                continue
+            entries.append((entry['last_used'], entry['size'], entry_path))
+
+        total = sum(size for _, size, _ in entries)
+        for last_used, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total -= size
+            logger.info(f"Result Cache: Evicted {entry_path}")
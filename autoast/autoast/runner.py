@@ -0,0 +1,120 @@
+###############################################################################################################################################################################
+#
+# Run queuefiles with an autoast profile
+#
+# The launchers in the V1, V2 and V3 folders call run_profile with their profile name and folder, the command line
+# (cli.py) calls run_queuefiles. Nothing heavy is imported at the top of this module: multiprocessing re-runs the top of
+# the launcher in every worker it spawns.
+#
+###############################################################################################################################################################################
+import os
+import logging
+
+# How each mode loads a queuefile: 'run' queues every row that isn't COMPLETE, 'resume' carries on after an interrupted
+# run and leaves Failed rows alone, 'retry-failed' only requeues the Failed rows (with dont_overwrite_outputs set)
+MODES = ['run', 'resume', 'retry-failed']
+
+
+def setup_run(profile, current_path, log_level=logging.INFO):
+    '''
+    Sets up logging, the environment of the profile's folder (its .env), the AST toolbox and the BCGW connection.
+    Returns the profile's factory class, the logger and the BCGW [user, password].
+    '''
+    from dotenv import load_dotenv
+    from .logging_setup import setup_logging
+    from .database_connection import setup_bcgw
+    from .toolbox_import import import_ast
+    from .profiles import get_profile, STATUSING_TOOLS_ENV
+
+    factory = get_profile(profile)
+
+    # Call the setup_logging function to log the messages
+    logger = setup_logging(log_level)
+    logger.info("Main: Running with the %s profile (%s)", factory.PROFILE, factory.__name__)
+
+    # Load the environment of the profile's folder (toolbox, template and secret file)
+    load_dotenv(os.path.join(current_path, '.env'))
+
+    # The call routine runs in the workers, which inherit the environment
+    if factory.STATUSING_TOOLS:
+        os.environ[STATUSING_TOOLS_ENV] = factory.STATUSING_TOOLS
+
+    # Call the import_ast function to import the AST toolbox
+    import_ast(logger)
+
+    # Call the setup_bcgw function to set up the database connection
+    secrets = setup_bcgw(logger)
+    return factory, logger, secrets
+
+
+def load_queuefile(ast, mode='run', only_rows=None):
+    ''' Loads the jobs of a factory's queuefile the way mode says (see MODES), only the Excel rows in only_rows if it is given '''
+    if mode == 'retry-failed':
+        return ast.re_load_failed_jobs_V2(only_rows)
+    if mode == 'resume':
+        return ast.load_jobs(only_rows, skip_conditions=('Failed',))
+    if mode == 'run':
+        return ast.load_jobs(only_rows)
+    raise ValueError(f"Unknown mode '{mode}', use one of {', '.join(MODES)}")
+
+
+def run_profile(profile, excel_file, current_path, max_workers=None, log_level=logging.INFO,
+                max_jobs_per_worker=None, max_rss_growth_mb=None):
+    '''
+    Runs the jobs of a queuefile with a profile ('v1', 'v2' or 'v3'). current_path is the profile's folder: its .env is
+    loaded, the queuefile and caches are found there, and excel_file is relative to it.
+    '''
+    factory, logger, secrets = setup_run(profile, current_path, log_level)
+
+    from .database_connection import release_bcgw
+    try:
+        # Create the path for the queuefile
+        qf = os.path.join(current_path, excel_file)
+
+        # Create an instance of the Ast Factory class, assign the queuefile path and the bcgw username and passwords to the instance
+        ast = factory(qf, secrets[0], secrets[1], logger, current_path, max_workers, max_jobs_per_worker, max_rss_growth_mb)
+
+        if not os.path.exists(qf):
+            print("Main: Queuefile not found, creating new queuefile")
+            logger.info("Main: Queuefile not found, creating new queuefile")
+            ast.create_new_queuefile()
+
+        # Load the jobs using the load_jobs method. This will scan the excel sheet and assign to "jobs"
+        ast.load_jobs()
+
+        # Run the jobs. Failed jobs are requeued with dont_overwrite_outputs and retried in the same batch
+        results = ast.batch_ast()
+    finally:
+        # The connection file holds the BCGW login, it is removed once the workers are done with it
+        release_bcgw(logger)
+
+    print("Main: AST Factory COMPLETE")
+    logger.info("Main: AST Factory COMPLETE")
+    return results
+
+
+def run_queuefiles(profile, queuefiles, current_path, mode='run', max_workers=None, job_timeout=None, only_rows=None,
+                   log_level=logging.INFO):
+    '''
+    Loads every queuefile the way mode says and runs all of their jobs in one batch on the same workers (see session.py).
+    Returns a dictionary of queuefile -> (job_index, condition) results.
+    '''
+    factory, logger, secrets = setup_run(profile, current_path, log_level)
+    from .session import QueueSession
+    from .database_connection import release_bcgw
+
+    try:
+        factories = []
+        for qf in queuefiles:
+            ast = factory(qf, secrets[0], secrets[1], logger, current_path, max_workers, job_timeout=job_timeout)
+            load_queuefile(ast, mode, only_rows)
+            factories.append(ast)
+
+        results = QueueSession(factories, logger).batch_ast()
+    finally:
+        # The connection file holds the BCGW login, it is removed once the workers are done with it
+        release_bcgw(logger)
+
+    print("Main: AST Factory COMPLETE")
+    logger.info("Main: AST Factory COMPLETE")
+    return {ast.queuefile: factory_results for ast, factory_results in zip(factories, results)}
@@ -0,0 +1,377 @@
+###############################################################################################################################################################################
+#
+# Job supervisor for batch_ast
+#
+###############################################################################################################################################################################
+import time
+import queue
+import logging
+import multiprocessing as mp
+from typing import NamedTuple
+from collections import namedtuple
+from .mp_worker import warm_worker, ResultQueue
+from .output_utilities import copy_ast_outputs
+from .logging_setup import log_channel, log_level
+
+
+# A job handed to a worker process, with the time it started and the time it must be finished by (both None until the worker starts it)
+RunningJob = namedtuple('RunningJob', ['pid', 'job_index', 'started', 'deadline'])
+
+
+class RetryPolicy(NamedTuple):
+    '''
+    How the supervisor retries failed jobs. A job runs at most max_attempts times. After each failure it waits
+    backoff_seconds * backoff_factor ** (attempt - 1) seconds (capped at max_backoff_seconds) before going back in the queue.
+    '''
+    max_attempts: int = 2
+    backoff_seconds: float = 60
+    backoff_factor: float = 2
+    max_backoff_seconds: float = 1800
+
+    def delay(self, attempt):
+        ''' Seconds to wait before the retry that follows failed attempt number attempt (1 based) '''
+        return min(self.backoff_seconds * self.backoff_factor ** (attempt - 1), self.max_backoff_seconds)
+
+
+class JobSupervisor:
+    '''
+    JobSupervisor runs a queue of jobs on a pool of warm worker processes and watches all of them at once.
+    Workers import arcpy and the AST toolbox once and then take many jobs, each from its own task queue, so the
+    supervisor always knows which worker holds a job. A worker that dies before starting its job uses up one of the
+    job's attempts like any other crash, so workers that can't start at all fail the batch instead of looping. Each job gets its own deadline counted from the moment a worker started it, so a hung job is killed as soon as its
+    own timeout runs out no matter where it sits in the queue. A failed job is requeued straight away (after
+    its backoff) with dont_overwrite_outputs set, until it runs out of attempts. Jobs that ask for the same
+    analysis as another job wait for it and get a copy of its outputs instead of running again. Results are
+    recorded in the order the jobs finish.
+    '''
+    # Longest time (seconds) to wait between checks on the running jobs
+    POLL_INTERVAL = 5
+
+    def __init__(self, ast_instance, max_workers, job_timeout, logger=None, max_jobs_per_worker=None, max_rss_growth_mb=None,
+                 retry_policy=None, result_cache=None, progress=None, job_timeouts=None, admission=None) -> None:
+        self.ast_instance = ast_instance
+        self.max_workers = max_workers
+        self.job_timeout = job_timeout
+        # Timeouts of individual jobs keyed by job index (see job_history.py), job_timeout is used for the rest
+        self.job_timeouts = job_timeouts or {}
+        # admission.AdmissionController that holds jobs in the queue until there is memory, a BCGW session and disk space for them
+        self.admission = admission
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self.retry_policy = retry_policy or RetryPolicy()
+        # result_cache.ResultCache handed to every worker, None runs every job through the toolbox
+        self.result_cache = result_cache
+        # progress.BatchProgress that is told about every job event, None if nothing is watching the batch
+        self.progress = progress
+        self.counters = {
+            'timeout_failed': 0,
+            'success': 0,
+            'worker_failed': 0,
+            'other_exception_failed': 0,
+            'retried': 0,
+            'deduplicated': 0,
+            'cache_hits': 0,
+        }
+        # (job_index, condition) tuples in the order the jobs finished
+        self.results = []
+        # Number of times each job has been started, keyed by job index
+        self.attempts = {}
+        # Latest payload for each job, keyed by job index
+        self.payloads = {}
+        # Jobs waiting for a worker, as [not_before, payload] pairs in queue order
+        self.pending = []
+        # Payloads of identical jobs waiting on another job's outputs, keyed by the job index they wait on
+        self.dependents = {}
+        # pids of the workers that are waiting for a job
+        self.idle_workers = set()
+        # pids of the workers that are recycling themselves and take no more jobs, until they have exited
+        self.retiring_workers = set()
+
+    def run(self, pending, dependents=None):
+        '''
+        Runs the pending JobPayloads until the queue is empty, with at most max_workers jobs running at once.
+        dependents maps a pending job index to the payloads of identical jobs that should receive its outputs.
+        Returns the list of (job_index, condition) results in completion order.
+        '''
+        self.pending = [[0, payload] for payload in pending]
+        self.dependents = {job_index: list(payloads) for job_index, payloads in (dependents or {}).items()}
+        if not self.pending:
+            return self.results
+        for _, payload in self.pending:
+            self.payloads[payload.job_index] = payload
+
+        result_queue = ResultQueue()
+
+        # Live worker processes and their task queues, keyed by pid
+        workers = {}
+        task_queues = {}
+        # Jobs handed to a worker, keyed by job index. The RunningJob has no start time or deadline until the worker starts the job
+        dispatched = {}
+
+        while self.pending or dispatched:
+
+            # Keep enough warm workers alive for the work that is left, replacing any that recycled themselves or were killed
+            while len(workers) - len(self.retiring_workers) < min(self.max_workers, len(self.pending) + len(dispatched)):
+                process, task_queue = self._start_worker(result_queue)
+                workers[process.pid] = process
+                task_queues[process.pid] = task_queue
+                self.idle_workers.add(process.pid)
+
+            # Only hand out as many jobs as there are idle workers to take them (and resources for), the rest wait here in the queue
+            now = time.time()
+            while self.idle_workers:
+                payload = self._next_ready(now, len(dispatched))
+                if payload is None:
+                    break
+                pid = self.idle_workers.pop()
+                task_queues[pid].put(payload)
+                dispatched[payload.job_index] = RunningJob(pid, payload.job_index, None, None)
+                self.attempts[payload.job_index] = self.attempts.get(payload.job_index, 0) + 1
+                self.logger.info("Job Supervisor: Job %s sent to worker %s (attempt %s)", payload.job_index, pid, self.attempts[payload.job_index])
+
+            # Sleep until a worker reports an event, the nearest deadline or retry passes, or the poll interval is up
+            wake_times = [r.deadline for r in dispatched.values() if r.deadline is not None]
+            wake_times += [not_before for not_before, _ in self.pending if not_before > now]
+            timeout = max(0, min(wake_times + [now + self.POLL_INTERVAL]) - now)
+            try:
+                self._handle_event(result_queue.get(timeout=timeout), dispatched)
+            except queue.Empty:
+                pass
+
+            if self.progress is not None:
+                self.progress.refresh()
+
+            # Forget workers that have exited
+            for pid, process in list(workers.items()):
+                if not process.is_alive():
+                    process.join()
+                    del workers[pid]
+                    task_queues.pop(pid).close()
+
+            # Handle every event that has arrived, including the last words of workers that just exited
+            self._drain_events(result_queue, dispatched)
+            self.idle_workers.intersection_update(workers)
+            self.retiring_workers.intersection_update(workers)
+
+            # Check every running job together
+            now = time.time()
+            for job_index, running_job in list(dispatched.items()):
+                if running_job.pid not in workers:
+                    # The worker died before or part way through the job without reporting a result
+                    del dispatched[job_index]
+                    self._record_result(job_index, running_job, None, now)
+
+                elif running_job.deadline is not None and now >= running_job.deadline:
+                    del dispatched[job_index]
+                    task_queues.pop(running_job.pid).close()
+                    self._kill_job(workers.pop(running_job.pid), running_job, now)
+
+        # Tell the remaining workers to shut down
+        for pid in workers:
+            task_queues[pid].put(None)
+        for process in workers.values():
+            process.join()
+        for task_queue in task_queues.values():
+            task_queue.close()
+
+        self.logger.info("Job Supervisor: Finished. Counters are %s", self.counters)
+        return self.results
+
+    def _next_ready(self, now, running=0):
+        '''
+        Takes the first pending payload whose backoff has passed and that the admission controller lets start off the queue,
+        None if nothing is ready. running is the number of jobs already handed out.
+        '''
+        if self.admission is not None and not self.admission.admit_machine(running):
+            return None
+        for position, (not_before, payload) in enumerate(self.pending):
+            if not_before > now:
+                continue
+            if self.admission is not None and not self.admission.admit_job(payload, running):
+                continue
+            del self.pending[position]
+            if self.admission is not None:
+                self.admission.job_admitted(now)
+            return payload
+        return None
+
+    def _requeue_unstarted(self, job_index, pid):
+        ''' Puts a job back at the front of the queue when its worker retired before taking it. It doesn't count as an attempt '''
+        self.attempts[job_index] -= 1
+        self.pending.insert(0, [0, self.payloads[job_index]])
+        self.logger.info("Job Supervisor: Worker %s is recycling, job %s is back at the front of the queue", pid, job_index)
+
+    def _drain_events(self, result_queue, dispatched):
+        ''' Handles every event waiting on the result queue without blocking '''
+        while True:
+            try:
+                event = result_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._handle_event(event, dispatched)
+
+    def _handle_event(self, event, dispatched):
+        ''' Updates the running jobs from a worker JobEvent and writes the job status as soon as it ends '''
+        job_index = event.job_index
+        if event.kind == 'retiring':
+            # The worker has left its job loop and is exiting. A job sent to it since its last job ended was never taken
+            self.idle_workers.discard(event.pid)
+            self.retiring_workers.add(event.pid)
+            for unstarted_index, running_job in list(dispatched.items()):
+                if running_job.pid == event.pid and running_job.started is None:
+                    del dispatched[unstarted_index]
+                    self._requeue_unstarted(unstarted_index, event.pid)
+            return
+
+        if event.kind != 'started' and event.pid not in self.retiring_workers:
+            # The worker is free for another job (if it has exited, it is dropped from the idle workers with the other dead ones)
+            self.idle_workers.add(event.pid)
+        if job_index not in dispatched:
+            # The job was already killed for running past its deadline
+            self.logger.warning("Job Supervisor: Ignoring late '%s' event for job %s", event.kind, job_index)
+            return
+
+        if event.kind == 'started':
+            # A worker has just picked the job up, its deadline counts from when it started
+            job_timeout = self.job_timeouts.get(job_index, self.job_timeout)
+            dispatched[job_index] = RunningJob(event.pid, job_index, event.time, event.time + job_timeout)
+            self.logger.info("Job Supervisor: Job %s started on worker %s, deadline in %.0f seconds", job_index, event.pid, job_timeout)
+            if self.progress is not None:
+                self.progress.job_started(job_index, event.time)
+
+        else:
+            running_job = dispatched.pop(job_index)
+            self._record_result(job_index, running_job, event, event.time)
+
+    def _start_worker(self, result_queue):
+        ''' Starts a warm worker process with its own task queue, returns the process and the queue '''
+        task_queue = mp.SimpleQueue()
+        process = mp.Process(
+            target=warm_worker,
+            args=(task_queue, result_queue, self.ast_instance.current_path, self.max_jobs_per_worker, self.max_rss_growth_mb,
+                  self.result_cache, log_channel(), log_level())
+        )
+        process.start()
+        self.logger.info("Job Supervisor: Started warm worker (pid %s)", process.pid)
+        print(f"Job Supervisor: Started warm worker (pid {process.pid})")
+        return process, task_queue
+
+    def _kill_job(self, process, running_job, now):
+        ''' Terminates the worker running a job that ran past its own deadline and marks the job as Failed '''
+        job_index = running_job.job_index
+        print(f"Job Supervisor: Job {job_index} exceeded timeout. Terminating process.")
+        self.logger.warning("Job Supervisor: Job %s exceeded timeout after %.0f seconds. Terminating worker %s.", job_index, now - running_job.started, running_job.pid)
+
+        # End the hung up job, then join to make sure the process is gone. A fresh worker takes its place
+        process.terminate()
+        process.join()
+
+        # The job needed at least this long, the duration history uses it so the next timeout of similar jobs is longer
+        self.ast_instance.record_job_duration(self.payloads[job_index], now - running_job.started, 'TIMEOUT')
+
+        self.counters['timeout_failed'] += 1
+        self.logger.error("Job Supervisor: Job %s exceeded timeout. Failed counter is %s", job_index, self.counters['timeout_failed'])
+        self._finish_job(job_index, 'Failed', now)
+
+    def _record_result(self, job_index, running_job, event, now):
+        ''' Records the outcome of a finished job. event is the worker's finished/failed JobEvent, None if the worker died '''
+        if event is not None:
+            elapsed = f"{event.duration:.0f}"
+        elif running_job is not None and running_job.started is not None:
+            elapsed = f"{now - running_job.started:.0f}"
+        else:
+            elapsed = "?"
+
+        if event is not None and not event.cached:
+            # Toolbox runs go in the duration history, restoring outputs from the cache says nothing about the tool
+            self.ast_instance.record_job_duration(self.payloads[job_index], event.duration, 'COMPLETE' if event.kind == 'finished' else 'Failed')
+
+        if event is not None and event.kind == 'finished':
+            condition = 'COMPLETE'
+            self.counters['success'] += 1
+            if event.cached:
+                self.counters['cache_hits'] += 1
+                print(f"Job Supervisor: Job {job_index} completed from the result cache.")
+                self.logger.info("Job Supervisor: Job %s outputs restored from the result cache in %s seconds. Success counter is %s", job_index, elapsed, self.counters['success'])
+            else:
+                print(f"Job Supervisor: Job {job_index} completed successfully.")
+                self.logger.info("Job Supervisor: Job %s completed successfully in %s seconds with %s arcpy warnings. Success counter is %s", job_index, elapsed, event.warning_count, self.counters['success'])
+
+        elif event is not None and event.kind == 'failed':
+            # Job failed due to an exception in the worker (something other than a timeout)
+            condition = 'Failed'
+            self.counters['worker_failed'] += 1
+            print(f"Job Supervisor: Job {job_index} failed due to an exception.")
+            self.logger.error("Job Supervisor: Job %s failed with %s in the Worker after %s seconds: %s. Worker failed counter is %s", job_index, event.exc_class, elapsed, event.message, self.counters['worker_failed'])
+
+        else:
+            # Handle unexpected cases, e.g. the worker process crashed before reporting its result
+            condition = 'Unknown Error'
+            self.counters['other_exception_failed'] += 1
+            print(f"Job Supervisor: Job {job_index} failed with unknown status.")
+            self.logger.error("Job Supervisor: Job %s failed with unknown status after %s seconds. Other Exception failed counter is %s", job_index, elapsed, self.counters['other_exception_failed'])
+
+        self._finish_job(job_index, condition, now)
+
+    def _finish_job(self, job_index, condition, now):
+        '''
+        Writes a job's final condition to the queuefile, or requeues a failed job that has attempts left.
+        Retries run with dont_overwrite_outputs set so the outputs of the failed attempt are reused.
+        '''
+        attempt = self.attempts.get(job_index, 1)
+        if condition != 'COMPLETE' and attempt < self.retry_policy.max_attempts:
+            delay = self.retry_policy.delay(attempt)
+            payload = self.ast_instance.retry_payload(self.payloads[job_index])
+            self.payloads[job_index] = payload
+            self.pending.append([now + delay, payload])
+            self.counters['retried'] += 1
+
+            self.ast_instance.add_job_result(job_index, 'Requeued')
+            if self.progress is not None:
+                self.progress.job_requeued(job_index)
+            print(f"Job Supervisor: Job {job_index} {condition}, requeued for attempt {attempt + 1} of {self.retry_policy.max_attempts} in {delay:.0f} seconds.")
+            self.logger.warning("Job Supervisor: Job %s %s on attempt %s, requeued with dont_overwrite_outputs in %.0f seconds", job_index, condition, attempt, delay)
+            return
+
+        self.ast_instance.add_job_result(job_index, condition)
+        self.results.append((job_index, condition))
+        if self.progress is not None:
+            self.progress.job_finished(job_index, condition, now)
+        self._finish_dependents(job_index, condition, now)
+
+    def _finish_dependents(self, job_index, condition, now):
+        '''
+        Hands the outputs of a finished job to the identical jobs waiting on it. If the job failed, the next
+        identical job is promoted and runs on its own, since the failure may be down to the first job's output directory.
+        '''
+        dependents = self.dependents.pop(job_index, [])
+        if not dependents:
+            return
+
+        if condition != 'COMPLETE':
+            promoted, rest = dependents[0], dependents[1:]
+            self.payloads[promoted.job_index] = promoted
+            if rest:
+                self.dependents[promoted.job_index] = rest
+            self.pending.append([now, promoted])
+            self.logger.warning("Job Supervisor: Job %s %s, running identical job %s in its place", job_index, condition, promoted.job_index)
+            return
+
+        source_directory = self.payloads[job_index].output_directory
+        for payload in dependents:
+            try:
+                copy_ast_outputs(source_directory, payload.output_directory, self.ast_instance.DEDUP_HARD_LINK, self.logger)
+                dependent_condition = 'COMPLETE'
+                self.counters['deduplicated'] += 1
+                print(f"Job Supervisor: Job {payload.job_index} is identical to job {job_index}, outputs copied.")
+                self.logger.info("Job Supervisor: Job %s is identical to job %s, copied its outputs to %s", payload.job_index, job_index, payload.output_directory)
+            except Exception as e:
+                dependent_condition = 'Failed'
+                print(f"Job Supervisor: Could not copy the outputs of job {job_index} for job {payload.job_index}: {e}")
+                self.logger.error("Job Supervisor: Could not copy the outputs of job %s for job %s: %s", job_index, payload.job_index, e)
+
+            self.ast_instance.add_job_result(payload.job_index, dependent_condition)
+            self.results.append((payload.job_index, dependent_condition))
+            if self.progress is not None:
+                self.progress.job_finished(payload.job_index, dependent_condition, now)
@@ -0,0 +1,103 @@
+###############################################################################################################################################################################
+#
+# Scratch workspaces for AOI preparation
+#
+###############################################################################################################################################################################
+import os
+import json
+import time
+import shutil
+import logging
+import tempfile
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SCRATCH_FOLDER = 'autoast_scratch'
+OWNER_FILE = 'owner.json'
+
+
+def scratch_root():
+    ''' Folder that holds every scratch workspace, under %TEMP% like the AOI GDBs always were '''
+    return os.path.join(os.getenv('TEMP') or tempfile.gettempdir(), SCRATCH_FOLDER)
+
+
+def pid_alive(pid):
+    ''' True if a process with this pid is running. Without psutil on Windows this can't be checked and returns False '''
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if os.name == 'nt':
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchWorkspace:
+    '''
+    A folder of its own for building one AOI, so AOIs can be built in parallel without one build deleting
+    another's output. The key is a hash of the AOI source, so a changed source always gets a fresh folder.
+    An owner file records the batch process using the workspace, so reap_orphans never removes a live one.
+    '''
+
+    def __init__(self, key, root=None) -> None:
+        self.key = key
+        self.root = root or scratch_root()
+        self.path = os.path.join(self.root, key)
+
+    def claim(self):
+        ''' Creates the workspace if needed and marks it as used by this process. Returns the workspace path '''
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, OWNER_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), 'claimed': time.time()}, f)
+        return self.path
+
+    def cleanup(self, logger=None):
+        logger = logger or logging.getLogger(__name__)
+        shutil.rmtree(self.path, ignore_errors=True)
+        logger.info(f"Scratch: Removed workspace {self.path}")
+
+
+def reap_orphans(max_age_seconds, root=None, logger=None):
+    '''
+    Removes scratch workspaces left behind by earlier runs: the process that claimed them is gone and they
+    haven't been claimed for max_age_seconds. Workspaces of failed jobs are kept until then so a rerun can reuse their AOI.
+    Returns the number of workspaces removed.
+    '''
+    logger = logger or logging.getLogger(__name__)
+    root = root or scratch_root()
+    if not os.path.isdir(root):
+        return 0
+
+    now = time.time()
+    removed = 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if not os.path.isdir(path):
+            continue
+        try:
+            with open(os.path.join(path, OWNER_FILE), encoding='utf-8') as f:
+                owner = json.load(f)
+            pid, claimed = owner['pid'], owner['claimed']
+        except (OSError, ValueError, KeyError):
+            # No owner file, fall back to the folder's modified time
+            pid, claimed = None, os.path.getmtime(path)
+
+        if pid is not None and pid_alive(pid):
+            continue
+        if now - claimed < max_age_seconds:
+            continue
+
+        shutil.rmtree(path, ignore_errors=True)
+        removed += 1
+        logger.info(f"Scratch: Reaped orphaned workspace {path}")
+
+    if removed:
+        print(f"Scratch: Reaped {removed} orphaned scratch workspaces")
+    return removed
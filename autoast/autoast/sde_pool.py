@@ -0,0 +1,99 @@
+###############################################################################################################################################################################
+#
+# Pool of BCGW connection files
+#
+# Creating a .sde connection file opens an Oracle session and takes a while, so one file of the BCGW user is created when a
+# run starts and reused by every job of the run. The file stores the login (the workers can't be asked for it), so it is kept
+# in the Windows user's app data (user_connection_folder), never in the repo's connection folders, and removed when the run ends.
+#
+###############################################################################################################################################################################
+import os
+import glob
+import hashlib
+import logging
+import threading
+from .gp_backend import get_backend
+
+# Environment variable that tells the status tool call routine (and the workers) which connection file to use
+SHARED_SDE_ENV = 'AUTOAST_SHARED_SDE'
+
+
+def user_connection_folder():
+    ''' Folder for the pooled connection files in the user's local app data (~/.autoast on machines without one) '''
+    app_data = os.getenv('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.autoast')
+    return os.path.join(app_data, 'autoast', 'connection')
+
+
+class ConnectionFilePool:
+    '''
+    ConnectionFilePool hands out one .sde file per BCGW user. The file name is built from a hash of the instance and user
+    (never the password), the files of other users are removed. A file is checked (it must still connect) the first time
+    it is handed out in a run, so a file left with an old password is created again.
+
+    The files store the login so the workers can connect with them. remove() deletes them when the batch is over, a file
+    left by a run that crashed is checked and reused by the next run and removed at its end.
+    Concurrent BCGW sessions are capped by the jobs that use them, see AST_FACTORY.MAX_BCGW_SESSIONS.
+    '''
+    PREFIX = 'bcgw_'
+
+    def __init__(self, folder, instance, logger=None) -> None:
+        self.folder = folder
+        self.instance = instance
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        # Connection files already checked in this run
+        self.validated = set()
+
+    def file_name(self, user):
+        digest = hashlib.sha256(f"{self.instance}|{user}".encode('utf-8')).hexdigest()[:16]
+        return f"{self.PREFIX}{digest}.sde"
+
+    def get(self, user, password):
+        ''' Returns the path of a working connection file for the credentials, creating it if there isn't one '''
+        backend = get_backend()
+        name = self.file_name(user)
+        path = os.path.join(self.folder, name)
+
+        with self.lock:
+            if path in self.validated:
+                return path
+
+            if os.path.exists(path):
+                if backend.validate_database_connection(path):
+                    self.logger.info(f"Connection Pool: Reusing the BCGW connection file {path}")
+                    self.validated.add(path)
+                    return path
+                self.logger.warning(f"Connection Pool: {path} no longer connects, creating it again")
+                os.remove(path)
+
+            os.makedirs(self.folder, exist_ok=True)
+            self._remove_stale(name)
+            path = backend.create_database_connection(self.folder, name, self.instance, user, password, save_credentials=True)
+            self.logger.info(f"Connection Pool: Created the BCGW connection file {path}")
+            self.validated.add(path)
+            return path
+
+    def remove(self):
+        ''' Deletes every connection file handed out by this pool, called when the batch is over '''
+        with self.lock:
+            for path in self.validated:
+                try:
+                    os.remove(path)
+                    self.logger.info(f"Connection Pool: Removed the BCGW connection file {path}")
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self.logger.warning(f"Connection Pool: Could not remove {path}, the next run removes it - {e}")
+            self.validated.clear()
+
+    def _remove_stale(self, keep):
+        ''' Removes the connection files of other users '''
+        for path in glob.glob(os.path.join(glob.escape(self.folder), f"{self.PREFIX}*.sde")):
+            if os.path.basename(path) == keep:
+                continue
+            try:
+                os.remove(path)
+                self.logger.info(f"Connection Pool: Removed the connection file of another user {path}")
+            except OSError as e:
+                # Probably still open in another run, it is removed next time
+                self.logger.warning(f"Connection Pool: Could not remove {path} - {e}")
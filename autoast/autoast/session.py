@@ -0,0 +1,124 @@
+###############################################################################################################################################################################
+#
+# Several queuefiles on one pool of workers
+#
+# batch_ast runs the jobs of one queuefile. A QueueSession runs the jobs of several queuefiles (one AST_FACTORY each) on the
+# same warm workers, so a batch machine stays busy until the last queuefile is done instead of draining at the end of each.
+# Job indexes are only unique within a queuefile, so the session numbers the jobs of the queuefile at position p from
+# p * INDEX_STRIDE and maps them back when a result is written to the queuefile.
+#
+###############################################################################################################################################################################
+from .scheduler import JobSupervisor
+from .progress import BatchProgress
+from .admission import AdmissionController
+from .logging_setup import set_log_phase
+
+
+class QueueSession:
+    '''
+    QueueSession runs the loaded jobs of one or more factories in a single batch. The workers, timeouts, retries, caches
+    and admission limits are those of the first factory, the jobs of the others only add to its queue. The session is
+    what the JobSupervisor reports results to, each result is passed on to the factory of its queuefile.
+    '''
+    INDEX_STRIDE = 100000  # Session job index of the first job of each queuefile, queuefiles have fewer rows than this
+
+    def __init__(self, factories, logger=None) -> None:
+        self.factories = list(factories)
+        self.lead = self.factories[0]
+        self.logger = logger or self.lead.logger
+        # The supervisor hands these to the workers and uses them to copy the outputs of identical jobs
+        self.current_path = self.lead.current_path
+        self.DEDUP_HARD_LINK = self.lead.DEDUP_HARD_LINK
+
+    def locate(self, job_index):
+        ''' Returns the factory and its own job index for a session job index '''
+        position, factory_index = divmod(job_index, self.INDEX_STRIDE)
+        return self.factories[position], factory_index
+
+    def add_job_result(self, job_index, condition):
+        factory, factory_index = self.locate(job_index)
+        factory.add_job_result(factory_index, condition)
+
+    def retry_payload(self, payload):
+        factory, _ = self.locate(payload.job_index)
+        return factory.retry_payload(payload)
+
+    def record_job_duration(self, payload, duration, condition):
+        factory, factory_index = self.locate(payload.job_index)
+        factory.record_job_duration(payload._replace(job_index=factory_index), duration, condition)
+
+    def batch_ast(self):
+        '''
+        Runs the Queued and Requeued jobs of every factory. Returns a list with the (job_index, condition) results of each
+        factory, in the order of the factories, with the factory's own job indexes.
+        '''
+        lead = self.lead
+        self.logger.info("\n")
+        self.logger.info("##########################################################################################################################")
+        self.logger.info("#")
+        set_log_phase('batch')
+        self.logger.info("Batch AST: Batching Jobs with Multiprocessing...")
+        self.logger.info("#")
+        self.logger.info("##########################################################################################################################")
+        self.logger.info("\n")
+
+        self.logger.info("Batch Ast: Job Timeout set to %s seconds", lead.job_timeout)
+        print(f"Batch Ast: Job Timeout set to {lead.job_timeout} seconds")
+
+        self.logger.info("Batch Ast: Running at most %s jobs at a time", lead.max_workers)
+        print(f"Batch Ast: Running at most {lead.max_workers} jobs at a time")
+
+        pending, dependents, estimates, timeouts = [], {}, {}, {}
+        for position, factory in enumerate(self.factories):
+            offset = position * self.INDEX_STRIDE
+            factory_pending, factory_dependents = factory.queued_payloads()
+            if any(job.get(factory.JOB_INDEX_KEY, 0) >= self.INDEX_STRIDE for job in factory.jobs):
+                raise ValueError(f"{factory.queuefile} has more than {self.INDEX_STRIDE} rows, split it into several queuefiles")
+            factory_timeouts = factory.job_timeouts(factory_pending + [payload for payloads in factory_dependents.values() for payload in payloads])
+            if offset:
+                self.logger.info("Batch Ast: Jobs of %s are numbered from %s in this batch", factory.queuefile, offset)
+                print(f"Batch Ast: Jobs of {factory.queuefile} are numbered from {offset} in this batch")
+
+            pending += [payload._replace(job_index=payload.job_index + offset) for payload in factory_pending]
+            for job_index, payloads in factory_dependents.items():
+                dependents[job_index + offset] = [payload._replace(job_index=payload.job_index + offset) for payload in payloads]
+            estimates.update({job_index + offset: estimate for job_index, estimate in factory.job_estimates.items()})
+            timeouts.update({job_index + offset: timeout for job_index, timeout in factory_timeouts.items()})
+
+        # Each factory ordered its own jobs longest first, the longest of all the queuefiles go first
+        if lead.ORDER_BY_COST and len(self.factories) > 1:
+            pending = sorted(pending, key=lambda payload: estimates.get(payload.job_index, 0), reverse=True)
+
+        # Counts, running jobs and the ETA are shown in the terminal and served as JSON while the batch runs
+        all_payloads = pending + [payload for payloads in dependents.values() for payload in payloads]
+        progress = BatchProgress(lead.max_workers, lead.PROGRESS_PORT, self.logger)
+        progress.start(all_payloads, estimates)
+
+        # The supervisor starts the jobs as slots free up, kills any job that runs past its own deadline
+        # and puts failed jobs straight back in the queue until they run out of attempts
+        supervisor = JobSupervisor(self, lead.max_workers, lead.job_timeout, self.logger,
+                                   lead.max_jobs_per_worker, lead.max_rss_growth_mb, lead.retry_policy, lead.result_cache(), progress,
+                                   timeouts, AdmissionController(lead.MIN_FREE_MEMORY_MB, lead.MAX_BCGW_SESSIONS, lead.MIN_FREE_DISK_MB, self.logger,
+                                                                 lead.JOB_MEMORY_MB, lead.JOB_MEMORY_RAMP))
+        try:
+            results = supervisor.run(pending, dependents)
+        finally:
+            progress.stop()
+
+        self.logger.info("Batch Ast: Jobs finished in this order: %s", [job_index for job_index, condition in results])
+
+        factory_results = [[] for _ in self.factories]
+        for job_index, condition in results:
+            position, factory_index = divmod(job_index, self.INDEX_STRIDE)
+            factory_results[position].append((factory_index, condition))
+
+        for factory, results in zip(self.factories, factory_results):
+            # Write the results of the batch to the workbook in one save
+            factory.flush_job_results()
+
+            # The AOIs of completed jobs aren't needed any more, failed jobs keep theirs for the next run
+            factory.cleanup_aoi_workspaces(results)
+
+        self.logger.info('\n')
+        self.logger.info("Batch Ast Complete - Check separate worker log file for more details")
+        return factory_results
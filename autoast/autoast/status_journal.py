@@ -0,0 +1,91 @@
+###############################################################################################################################################################################
+#
+# Write-behind status journal for the queuefile
+#
+###############################################################################################################################################################################
+import os
+import json
+import time
+import glob
+import logging
+
+
+class StatusJournal:
+    '''
+    StatusJournal records ast_condition changes in an append-only JSON lines file beside the queuefile.
+    Appending a line is cheap and safe from several processes, so jobs no longer open and save the whole
+    workbook for every status change. The AST_FACTORY writes the journal into the workbook in one batched
+    save at the end of each phase. If a run crashes before that, the leftover journal is replayed the next
+    time the queuefile is loaded.
+    '''
+    SUFFIX = '_status_journal.jsonl'
+    PENDING_SUFFIX = '.flushing'
+
+    def __init__(self, queuefile, logger=None) -> None:
+        self.path = os.path.splitext(queuefile)[0] + self.SUFFIX
+        self.logger = logger or logging.getLogger(__name__)
+
+    def append(self, job_index, condition):
+        ''' Appends one status change to the journal. Each change is written as a single line in one write call. '''
+        entry = {'job_index': job_index, 'condition': condition, 'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+        line = (json.dumps(entry) + '\n').encode('utf-8')
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def checkpoint(self):
+        '''
+        Moves the live journal aside so new changes go to a fresh file, then reads every journal waiting to be written
+        to the workbook (including any left over from a crashed run). Returns the entries in the order they were written
+        and the list of files to pass to commit once the workbook has been saved.
+        '''
+        if os.path.exists(self.path):
+            pending_name = f"{self.path}.{time.time_ns():020d}{self.PENDING_SUFFIX}"
+            try:
+                os.replace(self.path, pending_name)
+            except OSError as e:
+                # Another process is holding the journal open. The changes stay in the live journal for the next flush
+                self.logger.warning(f"Status Journal: Could not rotate {self.path} - {e}")
+
+        files = sorted(glob.glob(glob.escape(self.path) + '.*' + self.PENDING_SUFFIX))
+        entries = []
+        for file in files:
+            with open(file, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # A line cut short by a crash mid-write, everything before it is still good
+                        self.logger.warning(f"Status Journal: Skipping unreadable line in {file}: {line}")
+        return entries, files
+
+    def pending_entries(self):
+        ''' Reads the status changes not yet written to the workbook without moving any journal, oldest first '''
+        files = sorted(glob.glob(glob.escape(self.path) + '.*' + self.PENDING_SUFFIX))
+        if os.path.exists(self.path):
+            files.append(self.path)
+        entries = []
+        for file in files:
+            with open(file, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # Blank, or cut short by a crash mid-write
+                        continue
+        return entries
+
+    def commit(self, files):
+        ''' Removes journal files that have been written to the workbook '''
+        for file in files:
+            os.remove(file)
+
+    def has_pending(self):
+        ''' True if there are status changes that have not been written to the workbook yet '''
+        return os.path.exists(self.path) or bool(glob.glob(glob.escape(self.path) + '.*' + self.PENDING_SUFFIX))
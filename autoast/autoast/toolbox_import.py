@@ -1,5 +1,5 @@
 import os
-import arcpy
+from .gp_backend import get_backend
 
 #NOTE - Need to remove the template portion in the future
 
@@ -9,7 +9,8 @@ def import_ast(logger):
     #NOTE transfer this to modular version
     ast_tool_alias = os.getenv("TOOLBOXALIAS") # Alias name
 
-    if ast_toolbox is None:
+    backend = get_backend()
+    if ast_toolbox is None and backend.name == 'arcpy':
         print("Unable to find the toolbox. Check the path in .env file")
         logger.error("Unable to find the toolbox. Check the path in .env file")
         exit() 
@@ -17,7 +18,7 @@ def import_ast(logger):
     # Import the toolbox
     try:
         # print(arcpy.ListTools("*"))
-        arcpy.ImportToolbox(ast_toolbox, ast_tool_alias)
+        backend.import_toolbox(ast_toolbox, ast_tool_alias)
  
  
         logger.info(f"AST Toolbox imported successfully.")